@@ -0,0 +1,182 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from prosto.utils import *
+
+
+class Accumulator:
+    """
+    The class represents an aggregation function which can be evaluated incrementally.
+
+    An accumulator maintains a state for each group in a data frame indexed by group ids (row ids of the group table).
+    The state is updated by adding new rows or retracting removed rows of the fact table, and the aggregated value is computed from the state.
+    Partial states of different groups and batches are combined (merged) so that the fact table does not have to be grouped again.
+    """
+
+    # Accumulators which cannot retract removed rows (like min and max) are re-evaluated from scratch if rows are removed
+    retractable = True
+
+    def __init__(self, **model):
+        self.model = model
+
+    def initialize(self) -> pd.DataFrame:
+        """Create an empty state without groups."""
+        return pd.DataFrame(columns=self.get_state_columns(), dtype=float)
+
+    def update(self, state, values, groups) -> pd.DataFrame:
+        """Add values of (fact) rows belonging to the specified groups to the state and return the new state."""
+        return state.add(self.get_partial_state(values, groups), fill_value=0.0)
+
+    def retract(self, state, values, groups) -> pd.DataFrame:
+        """Remove values of (fact) rows belonging to the specified groups from the state and return the new state."""
+        return state.sub(self.get_partial_state(values, groups), fill_value=0.0)
+
+    def finalize(self, state) -> pd.Series:
+        """Compute aggregated values of all groups from their state."""
+        raise NotImplementedError("Method has to be implemented by an accumulator.")
+
+    def get_state_columns(self) -> List[str]:
+        raise NotImplementedError("Method has to be implemented by an accumulator.")
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        """Compute state for only the specified values (series) belonging to the specified groups (series of group ids)."""
+        raise NotImplementedError("Method has to be implemented by an accumulator.")
+
+
+class SumAccumulator(Accumulator):
+
+    def get_state_columns(self) -> List[str]:
+        return ["sum"]
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        gb = values.groupby(groups, sort=False)
+        return pd.DataFrame({"sum": gb.sum()})
+
+    def finalize(self, state) -> pd.Series:
+        return state["sum"]
+
+
+class CountAccumulator(Accumulator):
+
+    def get_state_columns(self) -> List[str]:
+        return ["count"]
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        gb = values.groupby(groups, sort=False)
+        return pd.DataFrame({"count": gb.count()})
+
+    def finalize(self, state) -> pd.Series:
+        return state["count"]
+
+
+class MeanAccumulator(Accumulator):
+
+    def get_state_columns(self) -> List[str]:
+        return ["sum", "count"]
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        gb = values.groupby(groups, sort=False)
+        return pd.DataFrame({"sum": gb.sum(), "count": gb.count()})
+
+    def finalize(self, state) -> pd.Series:
+        count = state["count"].where(state["count"] > 0)  # No values means no mean
+        return state["sum"] / count
+
+
+class VarAccumulator(Accumulator):
+    """Variance computed from the count, sum and sum of squares. Model parameter ddof is delta degrees of freedom (1 by default)."""
+
+    def get_state_columns(self) -> List[str]:
+        return ["count", "sum", "sum2"]
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        gb = values.groupby(groups, sort=False)
+        gb2 = (values * values).groupby(groups, sort=False)
+        return pd.DataFrame({"count": gb.count(), "sum": gb.sum(), "sum2": gb2.sum()})
+
+    def finalize(self, state) -> pd.Series:
+        ddof = self.model.get("ddof", 1)
+        dof = (state["count"] - ddof).where(state["count"] > ddof)
+        out = (state["sum2"] - state["sum"] * state["sum"] / state["count"]) / dof
+        return out.clip(lower=0.0)  # Rounding errors can produce small negative values
+
+
+class StdAccumulator(VarAccumulator):
+
+    def finalize(self, state) -> pd.Series:
+        return np.sqrt(super(StdAccumulator, self).finalize(state))
+
+
+class MinAccumulator(Accumulator):
+
+    retractable = False
+
+    def get_state_columns(self) -> List[str]:
+        return ["min"]
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        gb = values.groupby(groups, sort=False)
+        return pd.DataFrame({"min": gb.min()})
+
+    def update(self, state, values, groups) -> pd.DataFrame:
+        return pd.concat([state, self.get_partial_state(values, groups)]).groupby(level=0).min()
+
+    def retract(self, state, values, groups) -> pd.DataFrame:
+        raise NotImplementedError("Minimum cannot be retracted.".format())
+
+    def finalize(self, state) -> pd.Series:
+        return state["min"]
+
+
+class MaxAccumulator(Accumulator):
+
+    retractable = False
+
+    def get_state_columns(self) -> List[str]:
+        return ["max"]
+
+    def get_partial_state(self, values, groups) -> pd.DataFrame:
+        gb = values.groupby(groups, sort=False)
+        return pd.DataFrame({"max": gb.max()})
+
+    def update(self, state, values, groups) -> pd.DataFrame:
+        return pd.concat([state, self.get_partial_state(values, groups)]).groupby(level=0).max()
+
+    def retract(self, state, values, groups) -> pd.DataFrame:
+        raise NotImplementedError("Maximum cannot be retracted.".format())
+
+    def finalize(self, state) -> pd.Series:
+        return state["max"]
+
+
+# Built-in accumulators which can be specified by name as an aggregate function
+accumulators = {
+    "sum": SumAccumulator,
+    "count": CountAccumulator,
+    "mean": MeanAccumulator,
+    "var": VarAccumulator,
+    "std": StdAccumulator,
+    "min": MinAccumulator,
+    "max": MaxAccumulator,
+}
+
+def get_accumulator(func, model=None) -> Optional[Accumulator]:
+    """
+    Return an accumulator object for the specified function or None if it is not an accumulator.
+    The function can be an accumulator object, an accumulator class or a name of a built-in accumulator.
+    Model (a dict) is passed to the constructor.
+    """
+    if not isinstance(model, dict):
+        model = {}
+
+    if isinstance(func, Accumulator):
+        return func
+    elif isinstance(func, type) and issubclass(func, Accumulator):
+        return func(**model)
+    elif isinstance(func, str) and func.strip() in accumulators:
+        return accumulators[func.strip()](**model)
+    else:
+        return None
+
+
+if __name__ == "__main__":
+    pass
@@ -1,9 +1,16 @@
 from typing import Union, Any, List, Set, Dict, Tuple, Optional
 import json
 import math
+import inspect
+
+from pandas.api.indexers import BaseIndexer  # Custom window bounds of rolling objects (pandas>=1.0)
+
+import logging
+log = logging.getLogger("prosto")
 
 from prosto.utils import *
 from prosto.resolve import *
+from prosto.Accumulator import *
 
 import prosto as pr  # To resolve circular imports
 from prosto.Prosto import *
@@ -12,12 +19,30 @@
 from prosto.Operation import *
 
 
+class WindowBounds(BaseIndexer):
+    """Windows of a rolling object with the specified start and end (exclusive) positions of each row."""
+
+    def __init__(self, starts, ends):
+        super(WindowBounds, self).__init__()
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+
+    def get_window_bounds(self, *args, **kwargs):
+        return self.starts, self.ends
+
+    # pandas checks the parameters of this method which depend on its version
+    get_window_bounds.__signature__ = inspect.signature(BaseIndexer.get_window_bounds)
+
+
 class ColumnOperation(Operation):
     """The class represents one column operation."""
 
     def __init__(self, prosto, definition):
         super(ColumnOperation, self).__init__(prosto, definition)
 
+        # State of incremental evaluation: accumulator values of aggregation (and the fact rows they have been computed from) or trailing rows of rolling groups
+        self.state = None
+
     def get_dependencies_names(self) -> dict:
         """
         Get all dependencies represented by names like table names and column names as they are specified in the definition.
@@ -85,6 +110,11 @@ def get_dependencies_names(self) -> dict:
             if link_column_name:
                 dependencies[output_table_name].append(link_column_name)
 
+            # Time column (if any) for windows with duration
+            time_column_name = definition.get("time")
+            if time_column_name:
+                dependencies[output_table_name].append(time_column_name)
+
             # Linked table (if any) has to be populated. (Yet, it will be added to dependency by the link column.)
             if link_column_name:
                 linked_table_name = self.prosto.get_type_table(output_table_name, link_column_name)
@@ -114,15 +144,71 @@ def get_dependencies_names(self) -> dict:
         return dependencies
 
     def evaluate(self) -> None:
+        """Execute this column operation by evaluating its output and writing it to the output table."""
+        output = self.evaluate_output()
+        self.write_output(output)
+
+    def write_output(self, output) -> None:
+        """Write the output returned by the evaluation (a pair of output data and id range) to the output table and set the returned state (if any)."""
+        out, range = output[0], output[1]
+        self._impose_output_columns(out, range)
+        if len(output) > 2:
+            self.state = output[2]
+
+    def is_row_local(self) -> bool:
+        """Calculate, discretize, link and merge columns are row-local as well as compute columns declared as such."""
+        operation = self.definition.get("operation", "UNKNOWN").lower()
+        if operation.startswith("calc") or operation.startswith("disc") or operation.startswith("link") or operation.startswith("merg"):
+            return True
+        if operation.startswith("comp"):
+            return bool(self.definition.get("row_local", False))
+        return False
+
+    def is_incremental(self) -> bool:
+        """Links are valid only if the linked table has not been reset (rebuilt with new ids by a table operation) since they were evaluated."""
+        if not self.definition.get("operation", "UNKNOWN").lower().startswith("link"):
+            return True
+        state = self.state
+        linked_data = self._get_linked_table().data
+        return state is not None and state.get("data") == linked_data.id and state.get("generation") == linked_data.generation
+
+    def prepare(self) -> None:
+        """Extend the key index of the linked table used by links and build groups used by rolling and non-accumulator aggregation."""
+        definition = self.definition
+        operation = definition.get("operation", "UNKNOWN").lower()
+
+        if operation.startswith("link"):
+            linked_table = self._get_linked_table()
+            linked_columns = definition.get("linked_columns") or linked_table.definition.get("attributes", [])
+            if (self.prosto.incremental or linked_table.data.has_key_index(linked_columns)) and linked_table.data.all_columns_exist(linked_columns):
+                linked_table.data.get_key_index(linked_columns)
+        elif operation.startswith("roll"):
+            link_column_name = definition.get("link")
+            if link_column_name and not self.prosto.incremental:
+                self.prosto.get_table(definition.get("table"))._get_or_create_groupby(link_column_name)
+        elif operation.startswith("aggr"):
+            if get_accumulator(definition.get("function"), definition.get("model")) is None and definition.get("input_length") == "column":
+                self.prosto.get_table(self.get_tables()[0])._get_or_create_groupby(definition.get("link"))
+
+    def _get_linked_table(self):
+        """Table referenced by the output link column."""
+        table_name = self.definition.get("table")
+        return self.prosto.get_table(self.prosto.get_type_table(table_name, self.get_outputs()[0]))
+
+    def evaluate_output(self, range=None) -> tuple:
         """
-        Execute this column operation and evaluate the output column(s).
+        Evaluate the output column(s) of this column operation without writing them to the output table.
+        Return a pair of output data and an id range the output has to be written to (None means full range).
+        Links, aggregations with accumulators and rolling columns return also the new state which is set by write_output (the operation itself is not changed
+        because it might be a copy evaluated in a worker process).
+        If an id range is specified (for row-local operations only) then only the rows of this range are evaluated.
 
         A generic sequence of operations:
         - prepare the input slice by selecting input columns and input rows
         - convert the selected slice to the necessary data format expected by UDF
         - process input data by calling UDF or operation and returning some result
         - convert the result to our standard format
-        - impose the result to our current data by overwriting the output columns and output values
+        - return the result which is then imposed on the current data (overwriting output columns and values) by write_output
 
         Notes:
         - There are two types of definitions: relying on UDFs (calc, roll, aggr), and not using UDFs (link, merge)
@@ -143,54 +229,66 @@ def evaluate(self) -> None:
         output_column_name = outputs[0]
         output_column = self.prosto.get_column(output_table_name, output_column_name)
 
-        data = output_table.get_df()
-
         #
         # Operations without UDF
         #
 
         # Link columns use their own definition format different from computational (functional) definitions
         if operation.lower().startswith("link"):
-            out = self._evaluate_link()
+            # Output range according to the change status (the same rows are selected as input)
+            # All rows are linked again if the ids of the linked table have changed
+            if range is not None:
+                pass
+            elif self.prosto.incremental and self.is_incremental():
+                range = output_table.data.added_range
+            else:
+                range = output_table.data.id_range()
+
+            out = self._evaluate_link(range)
+            self.stats["rows_read"] += range.end - range.start
 
-            self._impose_output_columns(out)
+            linked_data = self._get_linked_table().data
+            state = {"data": linked_data.id, "generation": linked_data.generation}
 
-            return
+            return out, range, state
 
         # Compose columns use their own definition format different from computational (functional) definitions
         if operation.lower().startswith("merg"):
-            out = self._evaluate_merge()
+            out = self._evaluate_merge(range)
+            self.stats["rows_read"] += len(out)
 
-            self._impose_output_columns(out)
-
-            return
+            return out, range
 
         # Discretize column using some logic of partitioning represented in the model
         if operation.lower().startswith("disc"):
             # Determine input columns
-            columns = self.get_columns()
-            columns = get_columns(columns, data)
-            if columns is None:
-                raise ValueError("Error reading column list. Skip column definition.")
-
-            # Validation: check if all explicitly specified columns available
-            if not all_columns_exist(columns, data):
-                raise ValueError("Not all input columns available. Skip column definition.".format())
+            columns = self._get_input_columns(output_table.data)
 
-            # Slice input according to the change status
-            if self.prosto.incremental:
+            # Slice input according to the specified range or the change status
+            if range is not None:
+                data = output_table.data.get_slice(range.start, range.end, columns)
+            elif self.prosto.incremental:
                 data = output_table.data.get_added_slice(columns)
                 range = output_table.data.added_range
             else:
                 data = output_table.data.get_full_slice(columns)
                 range = output_table.data.id_range()
 
-
             out = self._evaluate_discretize(data, model)
+            self.stats["rows_read"] += len(data)
 
-            self._impose_output_columns(out, range)
+            return out, range
 
-            return
+        # Aggregate columns with accumulator functions (which can be evaluated incrementally)
+        if operation.lower().startswith("aggr"):
+            accumulator = get_accumulator(definition.get("function"), model)
+            if accumulator is not None:
+                out, state = self._evaluate_accumulate(accumulator)
+
+                # Values of all groups are computed from their current state
+                range = output_table.data.id_range()
+
+                return out, range, state
 
         #
         # Operations with UDF
@@ -200,23 +298,24 @@ def evaluate(self) -> None:
         if not func_name:
             raise ValueError("Column function '{}' is not specified. Skip column definition.".format(func_name))
 
-        func = resolve_full_name(func_name)
+        native_name = get_native_function_name(func_name)
+        if native_name and (operation.lower().startswith("roll") or operation.lower().startswith("aggr")):
+            func = native_name  # Built-in aggregation function will be evaluated by pandas without calling a Python function
+        else:
+            func = resolve_full_name(func_name)
         if not func:
             raise ValueError("Cannot resolve user-defined function '{}'. Skip column definition.".format(func_name))
+        if callable(func):
+            func = self._wrap_udf(func)
 
         if operation.lower().startswith("comp") or operation.lower().startswith("calc"):
             # Determine input columns
-            columns = self.get_columns()
-            columns = get_columns(columns, data)
-            if columns is None:
-                raise ValueError("Error reading column list. Skip column definition.")
+            columns = self._get_input_columns(output_table.data)
 
-            # Validation: check if all explicitly specified columns available
-            if not all_columns_exist(columns, data):
-                raise ValueError("Not all input columns available. Skip column definition.".format())
-
-            # Slice input according to the change status
-            if self.prosto.incremental:
+            # Slice input according to the specified range or the change status
+            if range is not None:
+                data = output_table.data.get_slice(range.start, range.end, columns)
+            elif self.prosto.incremental:
                 data = output_table.data.get_added_slice(columns)
                 range = output_table.data.added_range
             else:
@@ -232,29 +331,40 @@ def evaluate(self) -> None:
 
         elif operation.lower().startswith("roll"):
             # Determine input columns
-            columns = self.get_columns()
-            columns = get_columns(columns, data)
-            if columns is None:
-                raise ValueError("Error reading input column list. Skip column definition.")
-
-            # Validation: check if all explicitly specified columns available
-            if not all_columns_exist(columns, data):
-                raise ValueError("Not all input columns available. Skip column definition.".format())
+            columns = self._get_input_columns(output_table.data)
 
             # It exists only for rolling aggregation with grouping
             link_column_name = definition.get("link")
 
-            # Slice input according to the change status (incremental not implemented)
-            data = output_table.data.get_full_slice(columns)
-            range = output_table.data.id_range()
+            # Windows with duration are defined on timestamps and they have to be read along with input columns
+            time_column_name = definition.get("time")
+            if time_column_name and time_column_name not in columns:
+                columns = columns + [time_column_name]
 
             if input_length == "value":
                 raise NotImplementedError("Accumulation is not implemented.".format())
-            elif input_length == "column":
-                gb = output_table._get_or_create_groupby(link_column_name) if link_column_name else None
+            elif input_length != "column":
+                raise ValueError("Unknown input_type parameter '{}'.".format(input_length))
+
+            # Slice input according to the change status
+            if self.prosto.incremental:
+                # Added rows with the history rows which are needed for their windows
+                data, gb, state = self._get_roll_history(columns, link_column_name)
+                range = output_table.data.added_range
+
                 out = self._evaluate_roll(func, gb, data, data_type, model)
+                out = out[out.index >= range.start]  # History rows have been already evaluated
             else:
-                raise ValueError("Unknown input_type parameter '{}'.".format(input_length))
+                data = output_table.data.get_full_slice(columns)
+                range = output_table.data.id_range()
+                state = None
+
+                gb = output_table._get_or_create_groupby(link_column_name) if link_column_name else None
+                out = self._evaluate_roll(func, gb, data, data_type, model)
+
+            self.stats["rows_read"] += len(data)
+
+            return out, range, state
 
         elif operation.lower().startswith("aggr"):
             #
@@ -271,19 +381,10 @@ def evaluate(self) -> None:
             if link_column is None:
                 raise ValueError("Cannot find the link column '{}'.".format(link_column_name))
 
-            data = source_table.get_df()  # Data (to be processed) is a (source) table which is different from the output table
-
             # Determine input columns
-            columns = self.get_columns()
-            columns = get_columns(columns, data)
-            if columns is None:
-                raise ValueError("Error reading input column list. Skip column definition.")
-
-            # Validation: check if all explicitly specified columns available
-            if not all_columns_exist(columns, data):
-                raise ValueError("Not all input columns available. Skip column definition.".format())
+            columns = self._get_input_columns(source_table.data)
 
-            data = data[columns]  # Select only the specified *input* columns
+            data = source_table.data.get_full_slice(columns)  # Data (to be processed) is a (source) table which is different from the output table
 
             data_type = definition.get("data_type")
 
@@ -301,14 +402,30 @@ def evaluate(self) -> None:
         else:
             raise ValueError("Unknown operation type '{}' in the definition of column '{}'.".format(operation, self.id))
 
-        #
-        # Append the newly generated column(s) to this table
-        #
-        self._impose_output_columns(out, range)
+        self.stats["rows_read"] += len(data)
+
+        return out, range
+
+    def _get_input_columns(self, data) -> List[str]:
+        """Get input column names validated against the columns of the specified table data (without building its data frame)."""
+        header = pd.DataFrame(columns=data.get_column_names())  # Empty frame used to resolve column numbers and default (all) columns
+        columns = get_columns(self.get_columns(), header)
+        if columns is None:
+            raise ValueError("Error reading column list. Skip column definition.")
+
+        # Validation: check if all explicitly specified columns available
+        if not data.all_columns_exist(columns):
+            raise ValueError("Not all input columns available. Skip column definition.".format())
+
+        return columns
 
     def _evaluate_calculate(self, func, data, data_type, model):
         """Calculate column. Apply function to each row of the table."""
 
+        vectorize = self.definition.get("vectorize")
+        if vectorize:
+            return self._evaluate_calculate_vectorized(func, data, model, vectorize)
+
         #
         # Single input: Apply to a series. UDF will get single value
         #
@@ -362,6 +479,44 @@ def _evaluate_calculate(self, func, data, data_type, model):
 
         return out
 
+    def _evaluate_calculate_vectorized(self, func, data, model, vectorize):
+        """
+        Calculate column by passing input values to UDF as positional arguments (one argument for each input column).
+        If vectorize is "frompyfunc" then UDF is applied to the arrays of input values as a NumPy universal function (it is still called for each row but without creating row objects).
+        Otherwise, UDF is called once with whole columns (NumPy arrays) and if this fails or the result does not have one value for each row then it is called for each row with single values.
+        """
+
+        # Model is passed to UDF along with input values
+        if model is None:
+            fn = func  # No model
+        elif isinstance(model, (list, tuple)):
+            fn = lambda *x: func(*x, *model)  # Model as positional arguments
+        elif isinstance(model, dict):
+            fn = lambda *x: func(*x, **model)  # Model as keyword arguments
+        else:
+            fn = lambda *x: func(*x, model)  # Model as an arbitrary object
+
+        arrays = [data[x].values for x in data.columns]
+        length = len(data)
+
+        if vectorize == "frompyfunc":
+            out = np.frompyfunc(fn, len(arrays), 1)(*arrays) if length > 0 else np.array([], dtype=object)
+            return pd.Series(out, index=data.index).infer_objects()
+
+        # Call UDF once with all values
+        if length > 0:
+            try:
+                out = fn(*arrays)
+                if np.ndim(out) == 1 and len(out) == length:
+                    return pd.Series(np.asarray(out), index=data.index)
+                log.debug("Vectorized function of column '{}' returned {} values for {} rows. Fall back to row-wise application.".format(self.get_outputs()[0], np.size(out), length))
+            except Exception as e:
+                log.debug("Vectorized function of column '{}' failed ({}). Fall back to row-wise application.".format(self.get_outputs()[0], e))
+
+        # Call UDF for each row
+        out = [fn(*values) for values in zip(*arrays)]
+        return pd.Series(out, index=data.index, dtype=None if length > 0 else float)
+
     def _evaluate_compute(self, func, data, data_type, model):
         """Calculate column. Apply function to all inputs and return calculated column(s)."""
         #
@@ -379,19 +534,27 @@ def _evaluate_compute(self, func, data, data_type, model):
         #
         # Call UDF depending on the necessary model parameter
         #
+        return self._call_udf(func, data_arg, model)
+
+    @staticmethod
+    def _call_udf(func, data_arg, model):
+        """Call the UDF for one data argument by passing the model depending on its type."""
         if model is None:
-            out = func(data_arg)  # No model
+            return func(data_arg)  # No model
         elif isinstance(model, (list, tuple)):
-            out = func(data_arg, *model)  # Model as positional arguments
+            return func(data_arg, *model)  # Model as positional arguments
         elif isinstance(model, dict):
-            out = func(data_arg, **model)  # Model as keyword arguments
+            return func(data_arg, **model)  # Model as keyword arguments
         else:
-            out = func(data_arg, model)  # Model as an arbitrary object
+            return func(data_arg, model)  # Model as an arbitrary object
 
-        return out
-
-    def _evaluate_link(self):
-        """Link column. Output column will store ids (indexes) of the target table rows."""
+    def _evaluate_link(self, range=None):
+        """
+        Link column. Output column will store ids (indexes) of the target table rows.
+        If the linked table has an index on the linked columns (declared as its keys) then the keys are searched in this index.
+        In incremental mode, only added rows are linked by searching their keys in the (persistent) key index of the linked table.
+        If an id range is specified then only rows of this range are linked.
+        """
         definition = self.definition
 
         #
@@ -406,7 +569,7 @@ def _evaluate_link(self):
         output_column = self.prosto.get_column(main_table_name, column_name)
 
         main_keys = self.get_columns()
-        if not all_columns_exist(main_keys, main_table.get_df()):
+        if not main_table.data.all_columns_exist(main_keys):
             raise ValueError("Not all key columns available in the link column definition.".format())
 
         linked_table_name = self.prosto.get_type_table(main_table_name, column_name)
@@ -417,16 +580,28 @@ def _evaluate_link(self):
         linked_columns = definition.get("linked_columns", [])
         if len(linked_columns) == 0:
             linked_columns = linked_table.definition.get("attributes", [])  # By default (e.g., for projection), we link to target table attributes
-        if not all_columns_exist(linked_columns, linked_table.get_df()):
+        if not linked_table.data.all_columns_exist(linked_columns):
             raise ValueError("Not all linked key columns available in the link column definition.".format())
 
+        if range is not None:
+            main_df = main_table.data.get_slice(range.start, range.end, main_keys)
+        elif self.prosto.incremental:
+            main_df = main_table.data.get_added_slice(main_keys)
+        else:
+            main_df = main_table.data.get_full_slice(main_keys)
+
+        if self.prosto.incremental or linked_table.data.has_key_index(linked_columns):
+            return self._link_with_index(main_df, linked_table, linked_columns, column_name)
+
         #
         # 1. In the target (linked) table, convert its index into a normal column
         # The reason is that we can only merge normal columns and not index.
         # The values of this index column will be copied to our new link column and hence will reference the linked rows
+        # The column is added to a copy of the key columns so that the linked table itself is not modified (it could be read by other operations at the same time)
         #
         index_column_name = "__row_id__" # It could be "id", "index" or whatever other convention
-        linked_table.get_df()[index_column_name] = linked_table.get_df().index
+        linked_df = linked_table.data.get_full_slice(linked_columns).drop_duplicates(subset=linked_columns, keep="first")  # The first matching row is linked
+        linked_df[index_column_name] = linked_df.index
         # df.reset_index(inplace=True).set_index("index", drop=False, inplace=True)  ä Alternative 1: reset will convert index to column, and then again create index
         # df = df.rename_axis("index1").reset_index() # Alternative 2: New index1 column will be created
 
@@ -437,8 +612,8 @@ def _evaluate_link(self):
         linked_prefix = column_name + pr.Prosto.column_path_separator  # It will be prepended to each linked (secondary) column name
 
         out_df = pd.merge(
-            main_table.get_df(),  # This table
-            linked_table.get_df().rename(columns=lambda x: linked_prefix + x, inplace=False),  # Target table to link to. We rename columns (not in place - the original frame preserves column names)
+            main_df,  # This table (only key columns are needed)
+            linked_df.rename(columns=lambda x: linked_prefix + x, inplace=False),  # Target table to link to. We rename columns (not in place - the original frame preserves column names)
             how="left",  # This (main) table is not changed - we attach target records
             left_on=main_keys,  # List of main table key columns
             right_on= [linked_prefix + x for x in linked_columns],  # List of target table key columns. Note that we renamed them above so we use modified names
@@ -448,9 +623,6 @@ def _evaluate_link(self):
             sort=False  # Sorting decreases performance
         )
 
-        # We do not need this column anymore - it was merged (copied) to the result as a link column
-        linked_table.get_df().drop(columns=[index_column_name], inplace=True)
-
         #
         # 3. Rename according to our convention and store the result
         #
@@ -459,11 +631,35 @@ def _evaluate_link(self):
         out_df.rename({column_name + pr.Prosto.column_path_separator + index_column_name: column_name}, axis="columns", inplace=True)
 
         out = out_df[column_name]  # We need only one column from the result data frame
+        out.index = main_df.index  # Merge generates a new index while the left table rows are retained in the same order
 
         return out
 
-    def _evaluate_merge(self):
-        """Merge column. Materialize a complex column path which is sequence of link columns ending with some target column."""
+    def _link_with_index(self, main_df, linked_table, linked_columns, column_name):
+        """Find ids of the linked rows by looking up the keys of the specified main rows in the key index of the linked table."""
+        key_index = linked_table.data.get_key_index(linked_columns)
+        removed_end = linked_table.data.removed_range.end
+
+        keys = zip(*[main_df[x].values for x in main_df.columns])
+
+        ids = []
+        for key in keys:
+            row_id = key_index.get(key)
+            if row_id is not None and row_id < removed_end:  # The linked row has been removed
+                row_id = None
+            ids.append(row_id)
+
+        out = pd.Series(ids, index=main_df.index, name=column_name, dtype=float)
+        if not out.isna().any():
+            out = out.astype(int)
+
+        return out
+
+    def _evaluate_merge(self, range=None):
+        """
+        Merge column. Materialize a complex column path which is sequence of link columns ending with some target column.
+        If an id range is specified then only rows of this range are merged.
+        """
         definition = self.definition
 
         #
@@ -471,7 +667,6 @@ def _evaluate_merge(self):
         #
         output_table_name = definition.get("table")
         output_table = self.prosto.get_table(output_table_name)
-        output_table_data = output_table.get_df()
 
         outputs = self.get_outputs()
         output_column_name = outputs[0]
@@ -489,7 +684,10 @@ def _evaluate_merge(self):
             segments.extend(column_segments)
 
         link_column_path = ""  # Column path composed of several separated column segment names
-        df = output_table_data
+        if range is not None:
+            df = output_table.data.get_slice(range.start, range.end, [segments[0]])
+        else:
+            df = output_table.data.get_full_slice([segments[0]])
         main_table_name = output_table_name
         for i, link_column_name in enumerate(segments):
             #
@@ -515,13 +713,13 @@ def _evaluate_merge(self):
             #
             linked_table_name = self.prosto.get_type_table(main_table_name, link_column_name)
             linked_table = self.prosto.get_table(linked_table_name)
-            linked_table_data = linked_table.get_df()
 
             #
             # Find the target linked column in the linked table
             #
             linked_column_name = segments[i+1]
             #linked_column = linked_table.get_column(linked_column_name)
+            linked_table_data = linked_table.data.get_slice(0, linked_table.data.added_range.end, [linked_column_name])  # All physically existing rows
 
             #
             # Do merge
@@ -544,17 +742,10 @@ def _merge_two_columns(self, source_df, link_column_name, target_df, linked_colu
 
         linked_prefix = link_column_name + pr.Prosto.column_path_separator  # It will prepended to each linked (secondary) column name
 
-        out_df = pd.merge(
-            source_df[[link_column_name]],
-            target_df[[linked_column_name]].rename(columns=lambda x: linked_prefix + x, inplace=False),  # We rename target columns to avoid conflicts (not in place - the original frame preserves column names)
-            how="left",  # This (source) table is not changed - we want to attach target records
-            left_on=link_column_name,  # Its values are row ids stored in the linked table index
-            right_on=None,
-            left_index=False,
-            right_index=True,  # Use index because link column stores index values
-            #suffixes=("", linked_suffix),  # We do not use suffixes because they cannot be enforced (they are used only in the case of equal column names)
-            sort=False  # Sorting decreases performance
-        )
+        # Link column values are row ids of the target table and hence we directly look them up in its index (no join is needed)
+        out_df = source_df[[link_column_name]].copy()
+        linked_values = target_df[linked_column_name].reindex(out_df[link_column_name].values)
+        out_df[linked_prefix + linked_column_name] = linked_values.values
         # Here we get linked column names like "Prefix::OriginalName"
 
         return out_df
@@ -576,7 +767,6 @@ def _evaluate_discretize(self, data, model):
         else:
             raise ValueError("Discretize expects only one column as input")
 
-        # Discretization functions
         # Model example: {
         #   "origin/base/ancor": 1, (default is 0) - value the steps are started from (also negative). it is always label no 0 (but can represent left/negative or right/positive interval).
         #   "step/freq/rule": 10, - length of one whole interval (unit of the raster)
@@ -584,69 +774,215 @@ def _evaluate_discretize(self, data, model):
         #   "closed": "left/right" (default left),
         #   "label_value": "step/border" (default step_no, interval_no) - return intervla number or border value (note that returning float value is a bad idea because floats are bad representatives for discrete groups, also step/interval_no are continuous)
         #   }
-        def disc_numeric_fn(value, **model):
-            # How many whole steps from origin till this point (including or excluding) and what is the remainder
-            # How many whole (integer) steps are from origin to this value (in both directions)
-            #   What is origin - label number 0? If so, then we determine which, left or righ interval it represents with left-right borders, and it is a basis of further computations.
-            #   It is (value - origin) // step OR float division and then round by removing after dot (which is remainder)
-            #   int() rounds down so 1.9 will be 1,
-            #   math.floor(-0.5) = -1, 1.2 -> 1,
-
-            # ----0---------1---------2---------3--- label_no
-            #    )[        )[        )[        )[ closed left - either left or right label
-            #     ](        ](        ](        ]( closed right - either left or right label
+        if model is None:
+            raise ValueError("Discretize expects non-empty model.")
+        elif not isinstance(model, dict):
+            raise ValueError("Discretize expects a model with parameters passed as a dict.")
+
+        # Get parameters
+        origin = model.get("origin", 0)
+        step = model.get("step", 1)
+        label = model.get("label", "left")
+        closed = model.get("closed", "left")
+        label_value = model.get("label_value", "interval")
+
+        # How many whole steps from origin till this point (including or excluding) and what is the remainder
+        # How many whole (integer) steps are from origin to this value (in both directions)
+        #   What is origin - label number 0? If so, then we determine which, left or righ interval it represents with left-right borders, and it is a basis of further computations.
+        #   floor(-0.5) = -1, 1.2 -> 1,
+        # All values are processed as one array. Timestamps can be discretized if origin is a timestamp and step is a time delta.
+
+        # ----0---------1---------2---------3--- label_no
+        #    )[        )[        )[        )[ closed left - either left or right label
+        #     ](        ](        ](        ]( closed right - either left or right label
+
+        steps = np.asarray((ser - origin) / step, dtype=float)
+        left_border_no = np.floor(steps)  # floor: the largest integer less than or equal to x, floor(-0.5) = -1
+        right_border_no = np.ceil(steps)  # ceil: the smallest integer greater than or equal to x
 
-            # Get parameters
-            origin = model.get("origin", 0)
-            step = model.get("step", 1)
-            label = model.get("label", "left")
-            closed = model.get("closed", "left")
-            label_value = model.get("label_value", "interval")
-
-            steps = (value - origin) / step
-            left_border_no = math.floor(steps)  # floor: the largest integer less than or equal to x, floor(-0.5) = -1
-            right_border_no = math.ceil(steps)  # ceil: the smallest integer greater than or equal to x
-            # Alternatively, use math.modf(x) - Return the fractional and integer parts of x
-            # Alternatively, use int()
+        #
+        # Determine borders of the interval the value belongs to
+        #
+        on_border = left_border_no == right_border_no  # Value is exactly on the border - interval is not known (either left or right)
+        if closed == "left":  # Interval on the right
+            right_border_no = np.where(on_border, right_border_no + 1, right_border_no)
+        else:  # Interval on the left
+            left_border_no = np.where(on_border, left_border_no - 1, left_border_no)
 
-            #
-            # Determine borders of the interval the value belongs to
-            #
-            if left_border_no == right_border_no:  # Value is exactly on the border - interval is not known (either left or right)
-                if closed == "left":  # Interval on the right
-                    right_border_no += 1
-                else:  # Interval on the left
-                    left_border_no -= 1
+        #
+        # Determine label for this interval
+        #
+        if label == "left":
+            label_no = left_border_no
+        else:
+            label_no = right_border_no
 
-            #
-            # Determine label for this interval
-            #
-            if label == "left":
-                label_no = left_border_no
-            else:
-                label_no = right_border_no
+        out = pd.Series(label_no, index=ser.index, name=ser.name)
+        if not out.isna().any():
+            out = out.astype(int)  # Interval numbers are integers unless some values are missing
 
-            if label_value == "interval":
-                return label_no
-            else:
-                return label_no * step
+        if label_value != "interval":
+            out = out * step
 
-        if model is None:
-            raise ValueError("Discretize expects non-empty model.")
-        elif isinstance(model, (list, tuple)):
-            out = pd.Series.apply(ser, disc_numeric_fn, args=model)  # Model as positional arguments
-        elif isinstance(model, dict):
-            # Pass model by flattening dict (alternative: arbitrary Python object as positional or key argument). UDF has to declare the expected arguments
-            out = pd.Series.apply(ser, disc_numeric_fn, **model)  # Model as keyword arguments
-        else:
-            out = pd.Series.apply(ser, disc_numeric_fn, args=(model,))  # Model as an arbitrary object
+        return out
+
+    def _get_roll_history(self, columns, link_column_name):
+        """
+        Select the added rows and (for each of their groups) the trailing rows before them which are needed to fill their windows.
+        Ids of the trailing rows of each group are stored in the state so that the link column of old rows is read only if the state is not valid.
+        Return the selected input columns, a groupby object for them (or None if there is no link column) and the new state.
+        """
+        definition = self.definition
+        output_table = self.prosto.get_table(definition.get("table"))
+        output_data = output_table.data
+
+        added_range = output_data.added_range
 
+        if definition.get("time"):
+            return self._get_roll_time_history(columns, link_column_name)
+
+        history_length = max(int(definition.get("window")) - 1, 0)
+
+        if not link_column_name:
+            start_id = max(added_range.start - history_length, output_data.removed_range.end)
+            data = output_data.get_slice(start_id, added_range.end, columns)
+            return data, None, None
+
+        tails = self._get_roll_tails(output_data)
+        if tails is None:  # Trailing rows of all groups are found from the link column of old rows
+            links = output_data.get_slice(output_data.removed_range.end, added_range.start, [link_column_name])[link_column_name]
+            tails = self._get_group_tails(links, history_length)
+
+        # Trailing rows of the groups of the added rows (removed rows are always the oldest ones so the remaining rows are still the trailing rows)
+        new_links = output_data.get_added_slice([link_column_name])[link_column_name]
+        history_ids = [tails[x] for x in pd.unique(new_links.dropna()) if x in tails]
+        history_ids = np.sort(np.concatenate(history_ids)) if history_ids else np.array([], dtype=np.int64)
+        history_ids = history_ids[history_ids >= output_data.removed_range.end]
+
+        ids = np.concatenate([history_ids, np.arange(added_range.start, added_range.end)])
+        df = output_data.get_rows(ids, list(dict.fromkeys(columns + [link_column_name])))
+
+        tails = dict(tails)
+        tails.update(self._get_group_tails(df[link_column_name], history_length))
+        state = {"data": output_data.id, "end": added_range.end, "generation": self._get_group_generation(), "tails": tails}
+
+        gb = df.groupby(link_column_name, sort=False, as_index=True)
+        return df[columns], gb, state
+
+    def _get_roll_time_history(self, columns, link_column_name):
+        """
+        Select the added rows and the rows before them which are within the window duration from the earliest added row (of the same group).
+        Ids and times of the rows of each group which are within the window duration from its latest row are stored in the state.
+        Old rows are read only if the state is not valid or an added row is older than the stored rows of its group.
+        Return the selected input columns, a groupby object for them (or None if there is no link column) and the new state.
+        """
+        definition = self.definition
+        output_table = self.prosto.get_table(definition.get("table"))
+        output_data = output_table.data
+        added_range = output_data.added_range
+
+        time_column_name = definition.get("time")
+        key_columns = [time_column_name] + ([link_column_name] if link_column_name else [])
+
+        new_df = output_data.get_added_slice(key_columns)
+        duration = self._get_window_duration(new_df[time_column_name])
+
+        # Earliest time of the added rows of each group
+        new_keys = new_df[link_column_name] if link_column_name else pd.Series(0, index=new_df.index)
+        min_times = new_df[time_column_name].groupby(new_keys, sort=False).min()
+
+        tails = self._get_roll_tails(output_data)
+        if tails is not None and any(x in tails and tails[x][2] > t - duration for x, t in min_times.items()):
+            tails = None  # Rows which are needed for the added rows are not stored
+        if tails is None:  # History is selected from all old rows and only the rows within the window duration are stored
+            old_df = output_data.get_slice(output_data.removed_range.end, added_range.start, key_columns)
+            old_keys = old_df[link_column_name] if link_column_name else pd.Series(0, index=old_df.index)
+            stored_tails = self._get_group_times(old_df[time_column_name], old_keys, duration)
+            tails = self._get_group_times(old_df[time_column_name], old_keys, None)
+        else:
+            stored_tails = tails
+
+        history_ids = []
+        for key, min_time in min_times.items():
+            if key not in tails:
+                continue
+            ids, times, horizon = tails[key]
+            history_ids.append(ids[(times > min_time - duration) & (ids >= output_data.removed_range.end)])
+        history_ids = np.sort(np.concatenate(history_ids)) if history_ids else np.array([], dtype=np.int64)
+
+        ids = np.concatenate([history_ids, np.arange(added_range.start, added_range.end)])
+        df = output_data.get_rows(ids, list(dict.fromkeys(columns + key_columns)))
+
+        # Groups of the added rows have all their rows within the window duration from their latest row in the selected rows
+        keys = df[link_column_name] if link_column_name else pd.Series(0, index=df.index)
+        tails = dict(stored_tails)
+        tails.update(self._get_group_times(df[time_column_name], keys, duration))
+        state = {"data": output_data.id, "end": added_range.end, "generation": self._get_group_generation(), "tails": tails}
+
+        gb = df.groupby(link_column_name, sort=False, as_index=True) if link_column_name else None
+        return df[columns], gb, state
+
+    def _get_roll_tails(self, data):
+        """Return trailing rows of groups stored in the state if they have been selected from the same data before the added rows, or None otherwise."""
+        state = self.state
+        if state is None or state.get("data") != data.id or state.get("end") != data.added_range.start:
+            return None
+        if state.get("generation") != self._get_group_generation():  # Groups are stored by ids of the linked table which have changed
+            return None
+        return state["tails"]
+
+    def _get_group_generation(self):
+        """Generation of the table linked by the link (group) column or None if there is no such table."""
+        link_column_name = self.definition.get("link")
+        if not link_column_name:
+            return None
+        linked_table = self.prosto.get_table(self.prosto.get_type_table(self.definition.get("table"), link_column_name))
+        return linked_table.data.generation if linked_table is not None else None
+
+    @staticmethod
+    def _get_group_tails(links, length) -> dict:
+        """Ids of the last rows (at most the specified number) of each group of the link values."""
+        if length <= 0 or len(links) == 0:
+            return {}
+        tail = links.groupby(links, sort=False).tail(length)
+        ids = tail.index.values
+        return {key: ids[positions] for key, positions in tail.groupby(tail, sort=False).indices.items()}
+
+    @staticmethod
+    def _get_group_times(times, keys, duration) -> dict:
+        """
+        Ids, times and horizon of the rows of each group which are later than its horizon (the latest time minus duration).
+        If duration is None then all rows are returned and the horizon is None.
+        """
+        ids = times.index.values
+        values = times.values
+        out = {}
+        for key, positions in times.groupby(keys, sort=False).indices.items():
+            group_ids, group_times = ids[positions], values[positions]
+            if duration is None:
+                out[key] = (group_ids, group_times, None)
+                continue
+            horizon = pd.Series(group_times).max() - duration
+            selected = group_times > horizon
+            out[key] = (group_ids[selected], group_times[selected], horizon)
         return out
 
+    def _get_window_duration(self, times):
+        """Window duration for the timestamps of the specified type: time delta for datetime values and number otherwise."""
+        window = self.definition.get("window")
+        if pd.api.types.is_datetime64_any_dtype(times):
+            return pd.Timedelta(window)
+        else:
+            return float(window)
+
     def _evaluate_roll(self, func, gb, data, data_type, model):
         """Roll column. Apply aggregate function to each window defined on this same table for every record."""
         definition = self.definition
 
+        # Windows with duration (rather than number of rows)
+        if definition.get("time"):
+            return self._evaluate_roll_time(func, gb, data, data_type, model)
+
         #
         # Determine window size. The window parameter can be string, number or object (many arguments for rolling object)
         #
@@ -655,10 +991,31 @@ def _evaluate_roll(self, func, gb, data, data_type, model):
         rolling_args = {"window": window_size}
         # TODO: try/catch with exception if cannot get window size
 
+        #
+        # Built-in function (specified by name). Rolling aggregation is done by the corresponding pandas method
+        #
+        if isinstance(func, str):
+            if len(data.columns) != 1:
+                raise ValueError("Built-in rolling function '{}' can be applied to only one input column.".format(func))
+            in_column = data.columns.to_list()[0]
+
+            # A window with fewer rows than its size produces no value (as in the case of UDFs)
+            rolling_args["min_periods"] = window_size
+
+            if gb is None:
+                rl = data[in_column].rolling(**rolling_args)
+                out = getattr(rl, func)()
+            else:
+                rl = gb[in_column].rolling(**rolling_args)
+                out = getattr(rl, func)()
+                out.reset_index(level=0, drop=True, inplace=True)  # Remove group level of the index
+
+            return out
+
         #
         # Single input. UDF will get a window sub-series as a data argument
         #
-        if len(data.columns) == 1:
+        if len(data.columns) == 1 and not definition.get("batch", False):
 
             in_column = data.columns.to_list()[0]
 
@@ -696,82 +1053,146 @@ def groll_fn(g):
                 # The result is a series with aggregated values but it has MultiIndex: first level group, second level original id. Therefore, we cannot directly add it to the original frame
                 # Example for two devices and 6 rows: MultiIndex(levels=[[0, 1], [0, 1, 2, 3, 4, 5]], labels=[[0, 0, 0, 1, 1, 1], [0, 2, 4, 1, 3, 5]])
                 # Remove first level of index (group numbers). The labels of the second level will be then converted to a normal index with original ids corresponding to the frame index
-                out.reset_index(level=0, drop=True, inplace=True)
+                # Depending on the pandas version, group keys might be not added for such (transform-like) results
+                if isinstance(out.index, pd.MultiIndex):
+                    out.reset_index(level=0, drop=True, inplace=True)
 
         #
-        # Multiple inputs. UDF will get a window sub-dataframe as a data argument
+        # Multiple inputs. UDF will get a window sub-dataframe (or ndarray) as a data argument
         #
         else:
-            #
-            # Problem (of pandas): rolling apply passes only a series to UDF - we are not able to pass a frame (with multiple columns)
-            # Workaround: create a new temporary data frame with all row ids, create a rolling object over it, apply auxiliary function to it, it will get a window/group of row ids which can be then used to access this window rows from the main data frame:
-            # Link: https://stackoverflow.com/questions/45928761/rolling-pca-on-pandas-dataframe
-            #
+            out = self._evaluate_roll_windows(func, gb, data, data_type, model, window_size)
 
-            # Auxiliary function
-            # It gets a window as a series of row ids and an aggregate function
-            # It will select a sub-dataframe using these ids and pass it to UDF for aggregation and return the value
-            # Note that it selects data from a well known variable and uses a model defined outside
-            def window_fn(ids, user_fn):
-                df_window = data.loc[ids]  # Select rows of the window with the necessary ids
+        return out
 
-                # Determine format/type of representation
-                if data_type == "ndarray":
-                    data_arg = df_window.values
-                else:
-                    data_arg = df_window
+    def _evaluate_roll_windows(self, func, gb, data, data_type, model, window_size):
+        """
+        Apply UDF to windows of rows with multiple columns.
+        Windows are views of one NumPy array with the rows of a group (created by a sliding window) so no sub-frames are selected by ids.
+        The UDF gets a window as a 2-D ndarray (rows x columns) if the data type is "ndarray" and as a data frame otherwise.
+        If the operation is declared as batch, the UDF is called only once for the windows of all groups passed as one 3-D array (windows x rows x columns) and has to return one value for each window.
+        """
+        definition = self.definition
+        batch = definition.get("batch", False)
 
-                # Apply UDF to this window by invoking depending on the model type
-                if model is None:
-                    out = user_fn(data_arg)  # No model
-                elif isinstance(model, (list, tuple)):
-                    out = user_fn(data_arg, *model)  # Model as positional arguments
-                elif isinstance(model, dict):
-                    out = user_fn(data_arg, **model)  # Model as keyword arguments
-                else:
-                    out = user_fn(data_arg, model)  # Model as an arbitrary object
+        columns = data.columns.to_list()
+        values = data.values
+        ids = data.index.values
 
-                return out
+        # Positions of rows of each group. NOTE: "Groupby preserves the order of rows within each group"
+        if gb is None:
+            groups = [np.arange(len(data))]
+        else:
+            groups = [np.asarray(x) for x in gb.indices.values()]
+
+        out_ids = []
+        out_values = []
+        batch_windows = []
+        for positions in groups:
+            if len(positions) < window_size:
+                continue  # Windows are not full so there are no values
+
+            # Rows of one group are copied into one array (once) and all its windows are views of this array
+            group_values = values if gb is None else values[positions]
+            windows = sliding_windows(group_values, window_size)  # windows x rows x columns
+            out_ids.append(ids[positions[window_size - 1:]])  # Each window is assigned to its last row
+
+            if batch:
+                batch_windows.append(windows)
+            elif data_type == "ndarray":
+                out_values.extend(self._call_udf(func, w, model) for w in windows)
+            else:
+                out_values.extend(self._call_udf(func, pd.DataFrame(w, columns=columns, index=ids[positions[i:i + window_size]]), model) for i, w in enumerate(windows))
 
-            if gb is None:  # multiple columns without link/grouping
+        out_ids = np.concatenate(out_ids) if out_ids else np.array([], dtype=np.int64)
 
-                # Generate sequential row ids like 0,1,2,...
-                # NOTE: Why not to re-use existing integer index?
-                # NOTE: We should add a datetime column if it is used in the window definition
-                df_idx = pd.DataFrame(data=data.index, index=data.index)
-                #df_idx = pd.DataFrame(np.arange(data.shape[0]))
+        if batch and batch_windows:
+            out_values = self._call_udf(func, np.concatenate(batch_windows), model)
+            if len(out_values) != len(out_ids):
+                raise ValueError("Batch rolling function returned {} values for {} windows.".format(len(out_values), len(out_ids)))
 
-                # Create rolling object from ids-frame
-                # NOTE: We can use only row-based windows (not custom column based windows like timestamps with duration as a window parameter)
-                rl_idx = df_idx.rolling(**rolling_args)
+        out = pd.Series(list(out_values), index=out_ids, dtype=None if len(out_ids) else float)
 
-                # Apply UDF for rolling aggregation
-                out = rl_idx.apply(lambda x: window_fn(x, func), raw=False)
+        # Rows without (full) windows get no value
+        return out.reindex(data.index)
 
-            else:  # multiple columns with link/grouping
+    def _evaluate_roll_time(self, func, gb, data, data_type, model):
+        """
+        Apply aggregate function to windows with the specified duration.
+        A window of each row consists of the rows (of the same group) with timestamps in the interval (t - duration, t] where t is the timestamp of the row.
+        Rows are sorted by time within each group and window bounds are found by a binary search in the sorted timestamps.
+        """
+        definition = self.definition
 
-                out = pd.Series(index=data.index)
-                out.values[:] = None  # We need to assign default value which should be a parameter of column or operation
+        time_column_name = definition.get("time")
+        declared_columns = self.get_columns() or []
+        in_columns = [x for x in data.columns.to_list() if x != time_column_name or x in declared_columns]
+        if definition.get("batch", False):
+            raise ValueError("Batch rolling function cannot be applied to windows with duration because they have different lengths.".format())
+
+        times = data[time_column_name]
+        duration = self._get_window_duration(times)
+        if pd.api.types.is_datetime64_any_dtype(times):
+            times = times.values
+            duration = duration.to_timedelta64()
+        else:
+            times = times.values.astype(float)
 
-                # Perform rolling aggregation for each group independently in the loop and then merge all the results
-                # The body is logically equivalent to rolling aggregation without grouping (see above)
-                for n, df_g in gb:
-                    # g is a data frame with all records belonging to one group
+        values = data[in_columns].values
+        ids = data.index.values
 
-                    # Generate row ids for this group
-                    df_idx = pd.DataFrame(data=df_g.index, index=df_g.index)
+        if isinstance(func, str) and len(in_columns) != 1:
+            raise ValueError("Built-in rolling function '{}' can be applied to only one input column.".format(func))
 
-                    # Create rolling object for these ids (of this group only)
-                    rl_idx = df_idx.rolling(**rolling_args)
+        # Positions of rows of each group
+        if gb is None:
+            groups = [np.arange(len(data))]
+        else:
+            groups = [np.asarray(x) for x in gb.indices.values()]
+
+        out_ids = []
+        out_values = []
+        for positions in groups:
+            # Sort rows of the group by time (rows with equal timestamps retain their order)
+            order = np.argsort(times[positions], kind="stable")
+            positions = positions[order]
+            group_times = times[positions]
+            group_values = values[positions]
+
+            out_ids.append(ids[positions])
+
+            # Built-in function is evaluated by pandas using the sorted timestamps as an index
+            if isinstance(func, str):
+                if pd.api.types.is_datetime64_any_dtype(group_times):
+                    ser = pd.Series(group_values[:, 0].astype(float), index=pd.DatetimeIndex(group_times))
+                    out_values.append(getattr(ser.rolling(pd.Timedelta(duration)), func)().values)
+                    continue
+
+            # Window of each row starts from the first row with time greater than its time minus duration and ends with this row
+            starts = np.searchsorted(group_times, group_times - duration, side="right")
+            ends = np.arange(1, len(positions) + 1)
+
+            if isinstance(func, str):  # Rolling object with the found window bounds (empty windows produce values as for empty series)
+                rl = pd.Series(group_values[:, 0].astype(float)).rolling(WindowBounds(starts, ends), min_periods=0)
+                out_values.append(getattr(rl, func)().values)
+            elif data_type == "ndarray":
+                arg_values = group_values[:, 0] if len(in_columns) == 1 else group_values
+                out_values.append([self._call_udf(func, arg_values[s:e], model) for s, e in zip(starts, ends)])
+            elif len(in_columns) == 1:
+                out_values.append([self._call_udf(func, pd.Series(group_values[s:e, 0], index=ids[positions[s:e]], name=in_columns[0]), model) for s, e in zip(starts, ends)])
+            else:
+                out_values.append([self._call_udf(func, pd.DataFrame(group_values[s:e], columns=in_columns, index=ids[positions[s:e]]), model) for s, e in zip(starts, ends)])
 
-                    # Apply UDF for rolling aggregation by sending window ids, all data with all ids and function
-                    # Produce output for this group only (for indexes of this group)
-                    out_g = rl_idx.apply(lambda x: window_fn(x, func), raw=False)
+        out_ids = np.concatenate(out_ids) if out_ids else np.array([], dtype=np.int64)
+        if isinstance(func, str):
+            out_values = np.concatenate(out_values) if out_values else np.array([], dtype=float)
+        else:
+            out_values = [x for group_values in out_values for x in group_values]
 
-                    # Append results of aggregation for this group to the final result by index-based imposing (update)
-                    out.update(out_g[0])
+        out = pd.Series(out_values, index=out_ids, dtype=None if len(out_ids) else float)
 
-        return out
+        # Rows which do not belong to any group get no value
+        return out.reindex(data.index)
 
     def _evaluate_aggregate(self, func, gb, data, data_type, model):
         """Link (group) column. Apply aggregate function to each group of records of the fact table."""
@@ -783,6 +1204,15 @@ def _evaluate_aggregate(self, func, gb, data, data_type, model):
         if len(data.columns) == 0:
             out = gb.size()
 
+        #
+        # Built-in function (specified by name). Aggregation is done by the corresponding pandas method
+        #
+        elif isinstance(func, str):
+            if len(data.columns) != 1:
+                raise ValueError("Built-in aggregate function '{}' can be applied to only one input column.".format(func))
+            in_column = data.columns.to_list()[0]
+            out = gb[in_column].agg(func)
+
         #
         # Single input. UDF will get a window sub-series as a data argument
         #
@@ -814,6 +1244,79 @@ def _evaluate_aggregate(self, func, gb, data, data_type, model):
 
         return out
 
+    def _evaluate_accumulate(self, accumulator):
+        """
+        Aggregate column evaluated using an accumulator.
+        In incremental mode, the accumulator state computed in previous runs is updated using only the added and removed rows of the fact table.
+        Otherwise (or if the state is not consistent with the fact table), the state is computed from all fact rows.
+        Return the aggregated values along with the new state.
+        """
+        definition = self.definition
+
+        tables = self.get_tables()
+        source_table_name = tables[0]
+        source_table = self.prosto.get_table(source_table_name)
+        if source_table is None:
+            raise ValueError("Cannot find the fact table '{}'.".format(source_table_name))
+        source_data = source_table.data
+
+        link_column_name = definition.get("link")
+        link_column = source_table.get_column(link_column_name)
+        if link_column is None:
+            raise ValueError("Cannot find the link column '{}'.".format(link_column_name))
+
+        columns = self.get_columns()
+        if not source_data.all_columns_exist(columns):
+            raise ValueError("Not all input columns available. Skip column definition.".format())
+        if len(columns) > 1:
+            raise ValueError("Accumulators can aggregate only one input column.".format())
+        value_column_name = columns[0] if columns else link_column_name  # Without input columns we count non-empty links
+        input_columns = list(dict.fromkeys([value_column_name, link_column_name]))
+
+        state = self.state
+
+        # Values are stored for the ids of groups which change if the group table is reset (and then all facts are linked again)
+        group_data = self.prosto.get_table(definition.get("table")).data
+
+        # The state is valid if it has been computed from the same data and all rows before the current changes
+        is_valid = (
+            self.prosto.incremental
+            and state is not None
+            and state["data"] == source_data.id
+            and state["added_end"] == source_data.added_range.start
+            and state["removed_end"] == source_data.removed_range.start
+            and state.get("generation") == group_data.generation
+            and (accumulator.retractable or source_data.removed_length() == 0)
+        )
+
+        if is_valid:
+            values = state["values"]
+
+            if source_data.removed_length() > 0:
+                removed_range = source_data.removed_range
+                df = source_data.get_slice(removed_range.start, removed_range.end, input_columns)
+                values = accumulator.retract(values, df[value_column_name], df[link_column_name])
+                self.stats["rows_read"] += len(df)
+
+            df = source_data.get_added_slice(input_columns)
+            values = accumulator.update(values, df[value_column_name], df[link_column_name])
+
+        else:
+            df = source_data.get_full_slice(input_columns)
+            values = accumulator.update(accumulator.initialize(), df[value_column_name], df[link_column_name])
+
+        self.stats["rows_read"] += len(df)
+
+        state = {
+            "data": source_data.id,
+            "added_end": source_data.added_range.end,
+            "removed_end": source_data.removed_range.end,
+            "generation": group_data.generation,
+            "values": values,
+        }
+
+        return accumulator.finalize(values), state
+
     def _impose_output_columns(self, out, range=None):
         """
         Append the specified column(s) to the data frame of the output table.
@@ -859,6 +1362,7 @@ def _impose_output_columns(self, out, range=None):
         # Write the result to the data by overwriting cells
         #
         output_table.data.set_column_values_for_range(out, range, fillna_value)
+        output_table.groupby = {}  # Cached groups do not have the new column values
 
 
 if __name__ == "__main__":
@@ -0,0 +1,356 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+
+from prosto.utils import *
+
+from prosto.Data import *
+
+
+class ColumnarData(Data):
+    """
+    The class represents data physically stored as a set of NumPy arrays (one array for each attribute and column).
+
+    Arrays reserve more space than is used and their capacity is doubled when it is exhausted so that appending rows has amortized constant cost.
+    Data frames returned to operations and UDFs are constructed from the arrays.
+    Changing such a data frame does not change the data which has to be written by the corresponding methods.
+    """
+
+    initial_capacity = 16
+
+    def __init__(self, table):
+        """
+        Create a new empty data object for the specified table.
+
+        :param table: Table object this data belongs to
+        """
+
+        # Column name -> array. Only the first size elements of the arrays store (physically existing) rows
+        self.columns = {}
+        self.capacity = 0
+        self.size = 0
+
+        # Id of the first physically existing row (previous rows were deleted by gc)
+        self.start_id = 0
+
+        # Data frame with all physically existing rows which is built from the arrays when requested
+        self._df = None
+
+        super(ColumnarData, self).__init__(table)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.get_df()
+
+    @df.setter
+    def df(self, df) -> None:
+        self.set_df(df)
+
+    def get_df(self) -> pd.DataFrame:
+        if self._df is None:
+            index = pd.RangeIndex(self.start_id, self.start_id + self.size)
+            data = {name: arr[:self.size] for name, arr in self.columns.items()}
+            self._df = pd.DataFrame(data, index=index, columns=list(self.columns.keys()))
+            self._df.name = self.table.id
+        return self._df
+
+    def set_df(self, df) -> None:
+        old_columns = self.columns
+        self.columns = {}
+        for col in df.columns:
+            values = self._to_storage(df[col].values)
+            arr = self._allocate(col, len(df), values.dtype)
+            arr[:] = values
+            self._set_array(col, arr, old_columns.get(col))
+        self.capacity = len(df)
+        self.size = len(df)
+        self.start_id = int(df.index[0]) if len(df) > 0 else 0
+        self._df = None
+
+    def get_series(self, column_name) -> pd.Series:
+        index = pd.RangeIndex(self.start_id, self.start_id + self.size)
+        return pd.Series(self.columns[column_name][:self.size], index=index, name=column_name)
+
+    def get_column_names(self) -> List[str]:
+        return list(self.columns.keys())
+
+    def all_columns_exist(self, names) -> bool:
+        for col in names:
+            if col not in self.columns:
+                return False
+        return True
+
+    #
+    # Read column data
+    #
+
+    def get_values(self, column_name) -> pd.Series:
+        """Read column values"""
+        return self.get_series(column_name)
+
+    def get_slice(self, start_id, end_id, columns) -> pd.DataFrame:
+        """Get a slice with rows from the specified id range (end is exclusive) and specified columns. Arrays are sliced without copying."""
+        start, end = self._get_positions(start_id, end_id)
+        index = pd.RangeIndex(self.start_id + start, self.start_id + end)
+
+        if isinstance(columns, str):
+            return pd.Series(self.columns[columns][start:end], index=index, name=columns)
+
+        # One column is wrapped without copying its array (several arrays would be copied into one block)
+        if len(columns) == 1:
+            return pd.DataFrame(self.columns[columns[0]][start:end].reshape(-1, 1), index=index, columns=list(columns), copy=False)
+
+        data = {col: self.columns[col][start:end] for col in columns}
+        return pd.DataFrame(data, index=index, columns=list(columns))
+
+    def get_rows(self, ids, columns) -> pd.DataFrame:
+        """Get a slice with rows having the specified ids and specified columns"""
+        ids = np.asarray(ids, dtype=np.int64)
+        positions = ids - self.start_id
+
+        data = {col: self.columns[col][:self.size][positions] for col in columns}
+        return pd.DataFrame(data, index=ids, columns=list(columns))
+
+    def _get_range_values(self, start_id, end_id, columns) -> Tuple[np.ndarray, List[np.ndarray]]:
+        start, end = self._get_positions(start_id, end_id)
+        ids = np.arange(self.start_id + start, self.start_id + end)
+        return ids, [self.columns[col][start:end] for col in columns]
+
+    #
+    # Write column data
+    #
+
+    def set_column_values_for_range(self, update, range, default_value) -> int:
+        """
+        Impose columns from the specified data frame onto this data by overwriting existing cells using index for both columns and rows.
+        Values in the specified range which are absent in the update frame (or are NaN there) are set to the default value.
+        If a column is absent in the target then, it will be added.
+        If a row is absent in the target then, it will NOT be added.
+        """
+        if range is None:
+            range = self.id_range()  # Full range
+
+        start, end = self._get_positions(range.start, range.end)
+
+        # Positions of the rows of the update frame which physically exist
+        positions = np.asarray(update.index.values, dtype=np.int64) - self.start_id
+        existing = (positions >= 0) & (positions < self.size)
+
+        default_missing = default_value is None or (np.isscalar(default_value) and pd.isna(default_value))
+        if default_missing:
+            default_dtype = None
+        else:
+            default_dtype = self._to_storage(np.asarray([default_value])).dtype
+
+        # Fast path: the update frame has one row for each id of the range (in the same order) so its values are copied into the arrays by positions
+        if end - start == range.end - range.start and self._is_range_update(update, range):
+            for col in update.columns.to_list():
+                values = update[col] if default_missing else update[col].fillna(default_value)
+                values = self._to_storage(values.values)
+
+                arr = self._prepare_column(col, values.dtype, fill_missing=(end - start < self.size))
+                arr[start:end] = values
+
+            self._df = None
+
+            return range.end - range.start
+
+        for col in update.columns.to_list():
+            values = self._to_storage(update[col].values)
+            mask = existing & pd.notna(values)  # Missing values in the update frame are ignored
+
+            # Rows of the range which will get the default value because they are absent in the update frame
+            defaults = np.ones(end - start, dtype=bool)
+            in_range = positions[mask]
+            defaults[in_range[(in_range >= start) & (in_range < end)] - start] = False
+
+            # Rows which will have no value (missing values have to be representable by the column type)
+            missing = np.zeros(self.size, dtype=bool)
+            if col not in self.columns:
+                missing[:] = True
+                missing[positions[mask]] = False
+            if default_missing:
+                missing[start:end] = defaults
+            else:
+                missing[start:end] = False
+
+            if missing.any():
+                dtype = self._get_missing_dtype(values.dtype)
+            else:
+                dtype = values.dtype
+            if not default_missing and defaults.any():
+                dtype = self._get_common_dtype(dtype, default_dtype)
+
+            arr = self._prepare_column(col, dtype, missing.any())
+            if defaults.any():
+                arr[start:end][defaults] = self._get_missing_value(arr.dtype) if default_missing else default_value
+            arr[positions[mask]] = values[mask]
+
+        self._df = None
+
+        return range.end - range.start
+
+    #
+    # Add rows
+    #
+
+    def add(self, table) -> int:
+        """Add multiple new rows with the specified attribute values passed as a structured which is a dataframe or can be used to instantiate a data frame."""
+        first_id = self._get_next_id()
+
+        # One record with scalar values (dict or series) is added without creating a data frame
+        if isinstance(table, pd.Series) or (isinstance(table, dict) and not any(pd.api.types.is_list_like(x) for x in table.values())):
+            count = 1
+            values = {col: self._to_storage(np.asarray([value])) for col, value in dict(table).items()}
+        else:
+            if not isinstance(table, pd.DataFrame):
+                table = pd.DataFrame(table)
+            count = len(table)
+            values = {col: self._to_storage(table[col].values) for col in table.columns}
+
+        self._reserve(self.size + count)
+        if self.size == 0:
+            self.start_id = first_id
+
+        for col, arr in list(self.columns.items()):
+            if col not in values:  # Columns absent in the added data get missing values
+                arr = self._prepare_column(col, self._get_missing_dtype(arr.dtype))
+                arr[self.size:self.size + count] = self._get_missing_value(arr.dtype)
+
+        for col, col_values in values.items():
+            arr = self._prepare_column(col, col_values.dtype)
+            arr[self.size:self.size + count] = col_values
+
+        self.size += count
+        self._df = None
+
+        # Track changes
+        self.extend_added(count)
+        self._update_key_indexes()
+
+        return first_id
+
+    #
+    # Physically delete records and manage allocated space
+    #
+
+    def gc(self) -> None:
+        """Physically delete all records which are not used, that is, their removal was already propagated."""
+        end = self.removed_range.start
+        count = min(end - self.start_id, self.size)
+        if count <= 0:
+            return
+
+        # Shift the remaining rows to the beginning of the arrays
+        for arr in self.columns.values():
+            arr[:self.size - count] = arr[count:self.size]
+        self.size -= count
+        self.start_id += count
+        self._df = None
+
+        # Remove references to the deleted rows from key indexes
+        self._prune_key_indexes(end)
+
+    def reset(self) -> None:
+        """Physically remove all records and start from new empty table with no tracking."""
+
+        # Arrays (with their capacity) are retained and their types will be determined by the new data
+        self.size = 0
+        self.start_id = 0
+        self._df = None
+
+        # Track changes
+        self.added_range = Range(0, 0)
+        self.removed_range = Range(0, 0)
+        self.generation += 1
+
+        self._init_key_indexes()
+
+    def _reserve(self, capacity) -> None:
+        """Make sure that the arrays can store the specified number of rows by doubling their capacity if necessary."""
+        if capacity <= self.capacity:
+            return
+
+        capacity = max(capacity, 2 * self.capacity, self.initial_capacity)
+        for col, arr in list(self.columns.items()):
+            new_arr = self._allocate(col, capacity, arr.dtype)
+            new_arr[:self.size] = arr[:self.size]
+            self._set_array(col, new_arr, arr)
+        self.capacity = capacity
+
+    def _prepare_column(self, name, dtype, fill_missing=True) -> np.ndarray:
+        """
+        Return an array for the column which can store values of the specified type by creating it or converting its type if necessary.
+        A new column is filled with missing values for the existing rows unless they all are going to be overwritten.
+        """
+        old_arr = self.columns.get(name)
+        arr = old_arr
+
+        if old_arr is None:  # New column with missing values for the existing rows
+            if self.size > 0 and fill_missing:
+                arr = self._allocate(name, self.capacity, self._get_missing_dtype(dtype))
+                arr[:self.size] = self._get_missing_value(arr.dtype)
+            else:
+                arr = self._allocate(name, self.capacity, dtype)
+        elif self.size == 0:  # No values yet so the type is determined by the new values
+            if old_arr.dtype != dtype:
+                arr = self._allocate(name, self.capacity, dtype)
+        else:
+            common_dtype = self._get_common_dtype(old_arr.dtype, dtype)
+            if old_arr.dtype != common_dtype:
+                arr = self._allocate(name, self.capacity, common_dtype)
+                arr[:self.size] = old_arr[:self.size]
+
+        if arr is not old_arr:
+            self._set_array(name, arr, old_arr)
+        return arr
+
+    def _allocate(self, name, capacity, dtype) -> np.ndarray:
+        """Create a new (uninitialized) array for the column."""
+        return np.empty(capacity, dtype=dtype)
+
+    def _set_array(self, name, arr, old_arr) -> None:
+        """Replace the array of the column by a new array."""
+        self.columns[name] = arr
+
+    @staticmethod
+    def _to_storage(values) -> np.ndarray:
+        """Convert values to an array which can be stored. Strings are stored as objects."""
+        values = np.asarray(values)
+        if values.dtype.kind in "USV":
+            values = values.astype(object)
+        return values
+
+    @staticmethod
+    def _get_common_dtype(dtype1, dtype2) -> np.dtype:
+        if dtype1 == dtype2:
+            return dtype1
+        if dtype1.kind in "biuf" and dtype2.kind in "biuf":
+            return np.result_type(dtype1, dtype2)
+        return np.dtype(object)
+
+    @staticmethod
+    def _get_missing_dtype(dtype) -> np.dtype:
+        """Type which can represent missing values in addition to the values of the specified type."""
+        if dtype.kind in "biu":
+            return np.dtype(float)
+        return dtype
+
+    @staticmethod
+    def _get_missing_value(dtype) -> Any:
+        if dtype.kind in "mM":
+            return np.datetime64("NaT") if dtype.kind == "M" else np.timedelta64("NaT")
+        return np.nan
+
+    #
+    # Convenience methods
+    #
+
+    def _get_start_id(self) -> int:
+        return self.start_id
+
+    def _get_end_offset(self) -> int:
+        """Physically existing records"""
+        return self.size
+
+
+if __name__ == "__main__":
+    pass
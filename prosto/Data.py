@@ -1,5 +1,6 @@
 from typing import Union, Any, List, Set, Dict, Tuple, Optional
 import json
+import time
 from collections import namedtuple
 
 from prosto.utils import *
@@ -50,6 +51,18 @@ def __init__(self, table):
         self.removed_range = Range(0, 0)
         self.added_range = Range(0, 0)
 
+        # Number of resets. Row ids of the data before a reset are not valid anymore (for example, in link columns of other tables)
+        self.generation = 0
+
+        # Hash indexes on key columns. Tuple of column names -> (dict of key tuples -> row id, end of the indexed id range)
+        # Indexes on the declared keys of the table always exist while other indexes are created on demand
+        self._init_key_indexes()
+
+        # Write buffer with records which have been appended but not yet committed (added)
+        self.buffer = []
+        self.buffer_length = 0
+        self.buffer_time = None
+
     def __repr__(self):
         return "["+self.id+"]"
 
@@ -63,6 +76,9 @@ def set_df(self, df) -> None:
     def get_series(self, column_name) -> pd.Series:
         return self.df[column_name]
 
+    def get_column_names(self) -> List[str]:
+        return self.df.columns.to_list()
+
     def all_columns_exist(self, names) -> bool:
         columns = self.df.columns
         for col in names:
@@ -83,9 +99,7 @@ def get_full_slice(self, columns) -> pd.DataFrame:
         start_id = self.removed_range.end
         end_id = self.added_range.end
 
-        ret = self.df.loc[start_id:end_id, columns]
-
-        return ret
+        return self.get_slice(start_id, end_id, columns)
 
     def get_added_slice(self, columns) -> pd.DataFrame:
         """Get a slice with added rows and specified columns"""
@@ -93,10 +107,112 @@ def get_added_slice(self, columns) -> pd.DataFrame:
         start_id = self.added_range.start
         end_id = self.added_range.end
 
-        ret = self.df.loc[start_id:end_id, columns]
+        return self.get_slice(start_id, end_id, columns)
+
+    def get_slice(self, start_id, end_id, columns) -> pd.DataFrame:
+        """
+        Get a slice with rows from the specified id range (end is exclusive) and specified columns.
+        Rows are selected by their positions so that the slice is a view rather than a copy if the columns are adjacent (and have the same type).
+        """
+        start, end = self._get_positions(start_id, end_id)
+
+        if isinstance(columns, str):
+            return self.df[columns].iloc[start:end]
+
+        positions = self.df.columns.get_indexer(columns)
+        if (positions < 0).any():
+            raise KeyError("Columns {} not found in table '{}'.".format([c for c, p in zip(columns, positions) if p < 0], self.table.id))
+
+        if len(positions) > 0 and (np.diff(positions) == 1).all():
+            ret = self.df.iloc[start:end, positions[0]:positions[-1] + 1]  # Adjacent columns
+        else:
+            ret = self.df.iloc[start:end, positions]
 
         return ret
 
+    def get_rows(self, ids, columns) -> pd.DataFrame:
+        """Get a slice with rows having the specified ids and specified columns"""
+
+        ret = self.df.loc[ids, columns]
+
+        return ret
+
+    #
+    # Key indexes
+    #
+
+    def _init_key_indexes(self) -> None:
+        """Create empty indexes for the keys declared in the table definition."""
+        self.key_indexes = {}
+        keys = self.table.definition.get("keys")
+        if keys:
+            self.key_indexes[tuple(keys)] = ({}, 0, 0)
+
+    def has_key_index(self, columns) -> bool:
+        """Check if there is an index for the specified key columns."""
+        return tuple(columns) in self.key_indexes
+
+    def _update_key_indexes(self) -> None:
+        """Extend all existing indexes with newly added rows."""
+        for columns in list(self.key_indexes.keys()):
+            self.get_key_index(columns)
+
+    def get_key_index(self, columns) -> dict:
+        """
+        Get a hash index which maps values of the specified key columns (as tuples) to row ids.
+        The index is built when it is requested first time and is then extended with rows added since the previous request.
+        If several rows have equal keys then the first non-removed row is referenced.
+        If this row is removed then the key references the next non-removed row with the same key (if any).
+        """
+        columns = tuple(columns)
+        index, end, removed_end = self.key_indexes.get(columns, ({}, 0, 0))
+
+        # Keys of removed rows are moved to the first non-removed rows with the same key which have been already indexed
+        if removed_end < self.removed_range.end:
+            removed_end = self.removed_range.end
+            stale_keys = set(key for key, row_id in index.items() if row_id < removed_end)
+            if stale_keys:
+                for key in stale_keys:
+                    del index[key]
+                ids, values = self._get_range_values(removed_end, end, columns)
+                for key, row_id in zip(zip(*values), ids):
+                    if key in stale_keys and key not in index:
+                        index[key] = row_id
+            self.key_indexes[columns] = (index, end, removed_end)
+
+        if end < self.added_range.end:
+            start_id = max(end, removed_end)
+            ids, values = self._get_range_values(start_id, self.added_range.end, columns)
+
+            keys = zip(*values)
+            for key, row_id in zip(keys, ids):
+                if key not in index:
+                    index[key] = row_id
+
+            self.key_indexes[columns] = (index, self.added_range.end, removed_end)
+
+        return index
+
+    def _get_positions(self, start_id, end_id) -> Tuple[int, int]:
+        """Convert an id range into a range of physical positions by excluding physically absent rows."""
+        first_id = self._get_start_id()
+        size = self._get_end_offset()
+        start = min(max(start_id - first_id, 0), size)
+        end = min(max(end_id - first_id, start), size)
+        return start, end
+
+    def _get_range_values(self, start_id, end_id, columns) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Return row ids and a list of value arrays (one for each column) for the specified id range (end is exclusive)."""
+        df = self.get_slice(start_id, end_id, list(columns))
+        return df.index.values, [df[x].values for x in columns]
+
+    def _prune_key_indexes(self, end) -> None:
+        """Remove references to the rows with ids less than the specified end from key indexes."""
+        for index, _, _ in self.key_indexes.values():
+            deleted_keys = [key for key, row_id in index.items() if row_id < end]
+            for key in deleted_keys:
+                del index[key]
+
     #
     # Write column data
     #
@@ -114,6 +230,29 @@ def set_column_values_for_range(self, update, range, default_value) -> int:
 
         # TODO: Shorten update frame to the specified range if necessary (or at least check that it is inside the range and warn if not)
 
+        if range is None:
+            range = self.id_range()  # Full range
+
+        #
+        # Fast path: the update frame has one row for each id of the range (in the same order) so its values are written by positions without alignment and reset
+        #
+        start, end = self._get_positions(range.start, range.end)
+        if end - start == range.end - range.start and self._is_range_update(update, range):
+            default_missing = default_value is None or (np.isscalar(default_value) and pd.isna(default_value))
+            for col in update.columns.to_list():
+                values = update[col] if default_missing else update[col].fillna(default_value)
+
+                if start == 0 and end == len(self.df):  # The whole column is replaced
+                    self.df[col] = values.values
+                    continue
+
+                if col not in self.df.columns:
+                    # Type of the new column is taken from the values (if the default value can be represented) and not inferred from the default value
+                    self.df[col] = values.iloc[:0].reset_index(drop=True).reindex(np.arange(len(self.df)), fill_value=default_value).values
+                self.df.iloc[start:end, self.df.columns.get_loc(col)] = values.values
+
+            return range.end - range.start
+
         #
         # Update columns by ensuring that new columns exist
         #
@@ -125,12 +264,9 @@ def set_column_values_for_range(self, update, range, default_value) -> int:
         # Update values
         #
 
-        if range is None:
-            range = self.id_range()  # Full range
-
         # Approach 1:
         # 1) Assign default value to the data in the specified full range (essentially do reset)
-        self.df.loc[range.start:range.end, update.columns.to_list()] = default_value
+        self.df.loc[range.start:range.end - 1, update.columns.to_list()] = default_value
         # 2) Impose values from the update frame on the data. Missing values will not be changed and hence will be equal to default value.
         self.df.update(update, overwrite=True)
         # INFO: https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.update.html
@@ -148,6 +284,18 @@ def set_column_values_for_range(self, update, range, default_value) -> int:
 
         return range.end - range.start
 
+    @staticmethod
+    def _is_range_update(update, range) -> bool:
+        """Check if the index of the update frame consists of all ids of the range in increasing order."""
+        index = update.index
+        if len(index) != range.end - range.start:
+            return False
+        if len(index) == 0:
+            return True
+        if isinstance(index, pd.RangeIndex):
+            return index.start == range.start and index.step == 1
+        return index[0] == range.start and bool((np.diff(index.values) == 1).all())
+
     #
     # Add rows
     #
@@ -165,6 +313,7 @@ def add(self) -> int:
 
         # Track changes
         self.extend_added(1)
+        self._update_key_indexes()
 
         return first_id
 
@@ -185,6 +334,7 @@ def add(self, count) -> int:
 
         # Track changes
         self.extend_added(count)
+        self._update_key_indexes()
 
         return first_id
 
@@ -203,6 +353,7 @@ def add(self, record) -> int:
 
         # Track changes
         self.extend_added(1)
+        self._update_key_indexes()
 
         return first_id
 
@@ -211,10 +362,17 @@ def add(self, table) -> int:
         empty_value = None
         first_id = self._get_next_id()
 
+        # One record with scalar values (dict or series) is added as a table with one row
+        if isinstance(table, pd.Series) or (isinstance(table, dict) and not any(pd.api.types.is_list_like(x) for x in table.values())):
+            table = [dict(table)]
+
         # Data frame with new (added) row ids in the index and data to be appended
         count = len(table)
         new_ids = range(first_id, first_id + count)
-        table = pd.DataFrame(table, index=new_ids)  # Even if it is already a data frame, we want to explicitly set its index
+        if isinstance(table, pd.DataFrame):
+            table = table.set_axis(new_ids, axis="index")  # Replace its own index (not align with it)
+        else:
+            table = pd.DataFrame(table, index=new_ids)  # Even if it is already a data frame, we want to explicitly set its index
 
         # Approach 1
         self.df = self.df.append(table, sort=False)
@@ -224,9 +382,125 @@ def add(self, table) -> int:
 
         # Track changes
         self.extend_added(count)
+        self._update_key_indexes()
 
         return first_id
 
+    #
+    # Buffered append
+    #
+
+    def append(self, records) -> int:
+        """
+        Put records into the write buffer without adding them to the data and return the number of buffered rows.
+        Records can be passed as a dict or series (one record), a list of dicts or a data frame.
+        The buffer is committed if its length reaches the commit size or the oldest buffered record is older than the commit interval (in seconds) of the table definition.
+        """
+        if isinstance(records, pd.DataFrame):
+            chunk = records
+        elif isinstance(records, pd.Series) or (isinstance(records, dict) and not any(pd.api.types.is_list_like(x) for x in records.values())):
+            chunk = [dict(records)]
+        elif isinstance(records, dict):
+            chunk = pd.DataFrame(records)  # Dict of columns
+        else:
+            chunk = list(records)
+
+        if not self.buffer:
+            self.buffer_time = time.monotonic()
+
+        # Consecutive records are collected in one list so that they are converted to a data frame only once
+        if isinstance(chunk, list) and self.buffer and isinstance(self.buffer[-1], list):
+            self.buffer[-1].extend(chunk)
+        else:
+            self.buffer.append(chunk)
+        self.buffer_length += len(chunk)
+
+        commit_size = self.table.definition.get("commit_size")
+        commit_interval = self.table.definition.get("commit_interval")
+        if commit_size and self.buffer_length >= commit_size:
+            self.commit()
+        elif commit_interval is not None and time.monotonic() - self.buffer_time >= commit_interval:
+            self.commit()
+
+        return self.buffer_length
+
+    def commit(self) -> int:
+        """Add all buffered records to the data in one operation and return the number of added rows."""
+        if not self.buffer:
+            return 0
+
+        frames = [pd.DataFrame(x) if isinstance(x, list) else x for x in self.buffer]
+        if len(frames) == 1:
+            table = frames[0]
+        else:
+            table = pd.concat(frames, ignore_index=True, sort=False)
+
+        self.buffer = []
+        self.buffer_length = 0
+        self.buffer_time = None
+
+        if len(table) > 0:
+            self.add(table)
+
+        return len(table)
+
+    #
+    # Persistence
+    #
+
+    def save(self, file) -> dict:
+        """
+        Write all physically existing records to a NumPy .npz file (one array for each column).
+        Key indexes are written to the same file (one array of row ids and one array for each key column) so that they are not rebuilt after loading.
+        Return a dict with column names, key index ends and change tracking state which is needed to load the data.
+        """
+        df = self.get_df()
+        columns = df.columns.to_list()
+
+        arrays = {"c" + str(i): np.asarray(df[col].values) for i, col in enumerate(columns)}
+
+        key_indexes = []
+        for i, (key_columns, (index, end, removed_end)) in enumerate(self.key_indexes.items()):
+            keys = list(zip(*index.keys())) if index else [[] for x in key_columns]
+            arrays["k" + str(i)] = np.fromiter(index.values(), dtype=np.int64, count=len(index))
+            arrays.update({"k" + str(i) + "_" + str(j): np.asarray(x) for j, x in enumerate(keys)})
+            key_indexes.append({"columns": list(key_columns), "end": int(end), "removed_end": int(removed_end)})
+
+        np.savez(file, **arrays)
+
+        return {
+            "columns": columns,
+            "start_id": self._get_start_id(),
+            "length": len(df),
+            "added_range": [int(x) for x in self.added_range],
+            "removed_range": [int(x) for x in self.removed_range],
+            "generation": self.generation,
+            "key_indexes": key_indexes,
+        }
+
+    def load(self, file, state) -> None:
+        """Replace all records and change tracking state by those from the file and the state written by the save method."""
+        columns = state["columns"]
+        key_indexes = {}
+        with np.load(file, allow_pickle=True) as arrays:  # Non-numeric columns are stored as pickled objects
+            data = {col: arrays["c" + str(i)] for i, col in enumerate(columns)}
+
+            for i, key_index in enumerate(state.get("key_indexes", [])):
+                keys = zip(*[arrays["k" + str(i) + "_" + str(j)] for j in range(len(key_index["columns"]))])
+                index = dict(zip(keys, arrays["k" + str(i)].tolist()))
+                key_indexes[tuple(key_index["columns"])] = (index, key_index["end"], key_index["removed_end"])
+
+        index = pd.RangeIndex(state["start_id"], state["start_id"] + state["length"])
+        self.set_df(pd.DataFrame(data, index=index, columns=columns))
+
+        # Track changes
+        self.added_range = Range(*state["added_range"])
+        self.removed_range = Range(*state["removed_range"])
+        self.generation = state.get("generation", 0)
+
+        self._init_key_indexes()  # Indexes which have not been saved will be built from the loaded records when requested
+        self.key_indexes.update(key_indexes)
+
     #
     # Physically delete records and manage allocated space
     #
@@ -239,6 +513,10 @@ def gc(self) -> None:
         end = self.removed_range.start
         to_delete = range(start, end)
         self.df.drop(to_delete, inplace=True)
+
+        # Remove references to the deleted rows from key indexes
+        if len(to_delete) > 0:
+            self._prune_key_indexes(end)
         #self.df = self.df.iloc[len(to_delete):]
 
     def reset(self) -> None:
@@ -253,6 +531,9 @@ def reset(self) -> None:
         # Track changes
         self.added_range = Range(0, 0)
         self.removed_range = Range(0, 0)
+        self.generation += 1
+
+        self._init_key_indexes()
 
     #
     # Track changes
@@ -326,6 +607,10 @@ def remove_all(self) -> None:
     def _get_next_id(self)  -> int:
         return self.added_range.end
 
+    def _get_start_id(self) -> int:
+        """Id of the first physically existing record. Ids of physically existing records are sequential."""
+        return int(self.df.index[0]) if len(self.df) > 0 else 0
+
     def _get_start_offset(self) -> int:
         """Physically existing records"""
         return 0
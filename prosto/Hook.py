@@ -0,0 +1,153 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+import os
+import json
+import time
+import threading
+import cProfile
+import pstats
+
+from prosto.utils import *
+
+
+class Hook:
+    """
+    The class represents a set of functions which are called when a workflow is executed. Hooks are registered using Prosto.add_hook.
+
+    Operation and write hooks are called in the main thread. UDF hooks are called for each call of a user-defined function (possibly in worker threads)
+    and hence they are called only if the udf_calls attribute is true. Hooks are not called for operations evaluated in worker processes.
+    """
+
+    # UDF hooks are called only if this attribute is true because they add overhead to each call
+    udf_calls = False
+
+    def before_run(self, prosto) -> None:
+        """Called before the workflow is executed."""
+        pass
+
+    def after_run(self, prosto) -> None:
+        """Called after the workflow has been executed."""
+        pass
+
+    def before_operation(self, op) -> None:
+        """Called before the operation is evaluated."""
+        pass
+
+    def after_operation(self, op, metrics) -> None:
+        """Called after the operation has been evaluated and its output written. Metrics of the evaluation are passed as a dict."""
+        pass
+
+    def before_udf(self, op) -> None:
+        """Called before each call of the user-defined function of the operation."""
+        pass
+
+    def after_udf(self, op) -> None:
+        """Called after each call of the user-defined function of the operation."""
+        pass
+
+    def on_write(self, op, output) -> None:
+        """Called before the output of the operation is written to its table (once for each chunk in chunked evaluation)."""
+        pass
+
+
+class ProfileHook(Hook):
+    """
+    Profile evaluation of each operation with cProfile. Statistics (pstats.Stats objects) are accumulated for each operation id in the profiles dict.
+    Only evaluation in the main thread is profiled so operations evaluated by a thread or process executor get no statistics.
+    """
+
+    def __init__(self):
+        self.profiles = {}
+        self._profiler = None
+        self._op_id = None
+
+    def before_operation(self, op) -> None:
+        if self._profiler is not None:  # Operations of one layer are started concurrently
+            return
+        self._profiler = cProfile.Profile()
+        self._op_id = op.id
+        self._profiler.enable()
+
+    def after_operation(self, op, metrics) -> None:
+        if self._profiler is None or op.id != self._op_id:
+            return
+        self._profiler.disable()
+
+        if op.id in self.profiles:
+            self.profiles[op.id].add(self._profiler)
+        else:
+            self.profiles[op.id] = pstats.Stats(self._profiler)
+
+        self._profiler = None
+        self._op_id = None
+
+
+class TraceHook(Hook):
+    """
+    Record operations (and optionally UDF calls) of workflow runs as events in Chrome trace format which can be viewed in chrome://tracing or Perfetto.
+    The trace is written to the file (if specified) after each run.
+    """
+
+    def __init__(self, file=None, udf_calls=False):
+        self.file = file
+        self.udf_calls = udf_calls
+
+        self.events = []
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._starts = {}  # Operation id -> start time
+        self._local = threading.local()  # Start times of (nested) UDF calls in each thread
+
+    def before_operation(self, op) -> None:
+        self._starts[op.id] = self._now()
+
+    def after_operation(self, op, metrics) -> None:
+        start = self._starts.pop(op.id, None)
+        if start is None:
+            return
+        args = {k: v for k, v in metrics.items() if k not in ("operation", "outputs")}
+        self._add_event(op, "X", start, self._now() - start, args)
+
+    def before_udf(self, op) -> None:
+        if not hasattr(self._local, "starts"):
+            self._local.starts = []
+        self._local.starts.append(self._now())
+
+    def after_udf(self, op) -> None:
+        start = self._local.starts.pop()
+        self._add_event(op, "X", start, self._now() - start, {"function": op.definition.get("function")}, name="udf")
+
+    def on_write(self, op, output) -> None:
+        self._add_event(op, "i", self._now(), None, {}, name="write")
+
+    def after_run(self, prosto) -> None:
+        if self.file:
+            self.save(self.file)
+
+    def save(self, file) -> None:
+        """Write the recorded events to the specified file as a JSON object."""
+        with open(file, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def _add_event(self, op, phase, start, duration, args, name=None) -> None:
+        event = {
+            "name": name or ", ".join(op.get_outputs()),
+            "cat": op.operation,
+            "ph": phase,
+            "ts": start,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        if duration is not None:
+            event["dur"] = duration
+        if phase == "i":
+            event["s"] = "t"  # Instant event of a thread
+        self.events.append(event)  # Appending to a list is atomic
+
+    def _now(self) -> float:
+        """Time in microseconds since the hook was created."""
+        return (time.perf_counter() - self._origin) * 1e6
+
+
+if __name__ == "__main__":
+    pass
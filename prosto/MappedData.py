@@ -0,0 +1,176 @@
+from typing import Union, Any, List, Set, Dict, Tuple, Optional
+import os
+import json
+
+from prosto.utils import *
+
+from prosto.ColumnarData import *
+
+
+class MappedData(ColumnarData):
+    """
+    The class represents data physically stored as a set of memory-mapped .npy files in a directory (one file for each column).
+
+    Numeric and datetime columns are mapped so that they are read without loading and the same files can be shared by several processes.
+    Other (object) columns are stored in memory and written to files only when the data is flushed (only if they have been changed since the previous flush).
+    The directory also stores change tracking state and the data is restored from it when a data object is created for the same directory.
+    """
+
+    metadata_file = "data.json"
+
+    def __init__(self, table):
+        """
+        Create a data object for the specified table which stores its columns in the directory specified in the table definition (path).
+
+        :param table: Table object this data belongs to
+        """
+        self.path = table.definition.get("path")
+        if not self.path:
+            raise ValueError("Memory-mapped storage of table '{}' requires a directory path.".format(table.id))
+        os.makedirs(self.path, exist_ok=True)
+
+        # Column name -> file name (in the directory)
+        self.files = {}
+        self.file_no = 0
+
+        # Names of columns which have been written since the previous flush
+        self.changed_columns = set()
+
+        # Mode used to open existing files (mapped files in worker processes are opened read-only)
+        self.mode = "r+"
+
+        super(MappedData, self).__init__(table)
+
+        if os.path.exists(os.path.join(self.path, MappedData.metadata_file)):
+            self._open()
+            self._init_key_indexes()
+
+    def _allocate(self, name, capacity, dtype) -> np.ndarray:
+        """Create a new mapped file for numeric columns and an in-memory array for other columns."""
+        if dtype.kind not in "biufcmM" or capacity == 0:
+            return super(MappedData, self)._allocate(name, capacity, dtype)
+
+        file_name = "column_" + str(self.file_no) + ".npy"
+        self.file_no += 1
+        return np.lib.format.open_memmap(os.path.join(self.path, file_name), mode="w+", dtype=dtype, shape=(capacity,))
+
+    def _set_array(self, name, arr, old_arr) -> None:
+        """Replace the array of the column and delete the file of the old array which is not used anymore."""
+        super(MappedData, self)._set_array(name, arr, old_arr)
+        self.changed_columns.add(name)
+
+        if isinstance(arr, np.memmap):
+            self.files[name] = os.path.basename(arr.filename)
+        elif isinstance(old_arr, np.memmap):
+            self.files.pop(name, None)  # The file of an object column is written by flush
+
+        if isinstance(old_arr, np.memmap) and old_arr.filename != getattr(arr, "filename", None):
+            os.remove(old_arr.filename)
+
+    def _prepare_column(self, name, dtype, fill_missing=True) -> np.ndarray:
+        """Return the array of the column which is going to be written and remember that the column has been changed."""
+        self.changed_columns.add(name)
+        return super(MappedData, self)._prepare_column(name, dtype, fill_missing)
+
+    def gc(self) -> None:
+        """Physically delete all records which are not used and flush the data to the files."""
+        start_id = self.start_id
+        super(MappedData, self).gc()
+        if self.start_id != start_id:  # Rows of all columns have been shifted
+            self.changed_columns.update(self.columns.keys())
+        self.flush()
+
+    def reset(self) -> None:
+        """Physically remove all records (all columns are changed)."""
+        super(MappedData, self).reset()
+        self.changed_columns.update(self.columns.keys())
+
+    def flush(self) -> None:
+        """Write changes of the mapped files, changed object columns and the change tracking state to the directory."""
+        columns = []
+        for name, arr in self.columns.items():
+            if isinstance(arr, np.memmap):
+                if name in self.changed_columns:
+                    arr.flush()
+                columns.append({"name": name, "file": self.files[name], "mapped": True})
+            elif name not in self.changed_columns and name in self.files:
+                columns.append({"name": name, "file": self.files[name], "mapped": False})
+            else:
+                file_name = "column_" + str(self.file_no) + ".npy"
+                self.file_no += 1
+                np.save(os.path.join(self.path, file_name), arr[:self.size], allow_pickle=True)
+                old_file_name = self.files.get(name)
+                if old_file_name:
+                    os.remove(os.path.join(self.path, old_file_name))
+                self.files[name] = file_name
+                columns.append({"name": name, "file": file_name, "mapped": False})
+
+        self.changed_columns = set()
+
+        metadata = {
+            "columns": columns,
+            "file_no": self.file_no,
+            "capacity": self.capacity,
+            "size": self.size,
+            "start_id": self.start_id,
+            "added_range": [int(x) for x in self.added_range],
+            "removed_range": [int(x) for x in self.removed_range],
+            "generation": self.generation,
+        }
+        with open(os.path.join(self.path, MappedData.metadata_file), "w") as f:
+            json.dump(metadata, f, indent=4)
+
+    def _open(self) -> None:
+        """Restore columns and change tracking state from the files in the directory."""
+        with open(os.path.join(self.path, MappedData.metadata_file), "r") as f:
+            metadata = json.load(f)
+
+        self.columns = {}
+        self.files = {}
+        self.size = metadata["size"]
+        self.start_id = metadata["start_id"]
+        self.file_no = metadata["file_no"]
+
+        capacity = metadata["capacity"]
+        for column in metadata["columns"]:
+            file_path = os.path.join(self.path, column["file"])
+            if column["mapped"]:
+                arr = np.load(file_path, mmap_mode=self.mode)
+            else:
+                values = np.load(file_path, allow_pickle=True)
+                arr = super(MappedData, self)._allocate(column["name"], capacity, values.dtype)
+                arr[:len(values)] = values
+            self.columns[column["name"]] = arr
+            self.files[column["name"]] = column["file"]
+        self.capacity = min([len(x) for x in self.columns.values()], default=capacity)
+
+        self.added_range = Range(*metadata["added_range"])
+        self.removed_range = Range(*metadata["removed_range"])
+        self.generation = metadata.get("generation", 0)
+
+        self._df = None
+        self.changed_columns = set()
+
+    def __getstate__(self):
+        """Mapped arrays are pickled as names of their files which are opened again (read-only) after unpickling."""
+        state = self.__dict__.copy()
+        state["columns"] = {}
+        for name, arr in self.columns.items():
+            if isinstance(arr, np.memmap):
+                arr.flush()
+                state["columns"][name] = self.files[name]
+            else:
+                state["columns"][name] = arr
+        state["_df"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.mode = "r"  # Copies (in worker processes) never write the files
+        for name, arr in self.columns.items():
+            if isinstance(arr, str):
+                self.columns[name] = np.load(os.path.join(self.path, arr), mmap_mode=self.mode)
+
+
+if __name__ == "__main__":
+    pass
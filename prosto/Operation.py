@@ -1,5 +1,7 @@
 from typing import Union, Any, List, Set, Dict, Tuple, Optional
 import json
+import types
+import functools
 
 from prosto.utils import *
 
@@ -32,9 +34,62 @@ def __init__(self, prosto, definition):
         self.definition = definition
         self.operation = definition.get("operation")
 
+        # Statistics of the current evaluation which are reported in the run metrics
+        self.stats = {}
+        self.reset_stats()
+
     def __repr__(self):
         return "["+self.id+"::"+self.operation+"]"
 
+    def reset_stats(self) -> None:
+        """Start collecting statistics of a new evaluation (it may consist of several evaluations of chunks)."""
+        self.stats = {"rows_read": 0, "rows_written": 0, "bytes_written": 0, "udf_calls": 0}
+
+    def _wrap_udf(self, func):
+        """
+        Return a function which calls the specified UDF and counts its calls in the statistics. UDF hooks are called only if they are registered.
+        Functions which are not Python functions (like NumPy ufuncs and builtins) or are defined in NumPy or pandas are not wrapped
+        because pandas evaluates them in a vectorized way only if it gets them as is. They are counted as one call.
+        """
+        stats = self.stats
+
+        module = getattr(func, "__module__", None) or ""
+        if not isinstance(func, (types.FunctionType, functools.partial)) or module.split(".")[0] in ("numpy", "pandas"):
+            stats["udf_calls"] += 1
+            return func
+
+        hooks = [x for x in self.prosto.hooks if x.udf_calls]
+
+        if not hooks:
+            def counted_func(*args, **kwargs):
+                stats["udf_calls"] += 1
+                return func(*args, **kwargs)
+
+            return counted_func
+
+        def hooked_func(*args, **kwargs):
+            stats["udf_calls"] += 1
+            for hook in hooks:
+                hook.before_udf(self)
+            out = func(*args, **kwargs)
+            for hook in hooks:
+                hook.after_udf(self)
+            return out
+
+        return hooked_func
+
+    def is_row_local(self) -> bool:
+        """Check if each output row depends only on the same input row so that the operation can be evaluated for any subset of rows independently."""
+        return False
+
+    def is_incremental(self) -> bool:
+        """Check if only added rows can be evaluated in incremental mode, that is, the output of the previous evaluations is still valid."""
+        return True
+
+    def prepare(self) -> None:
+        """Build caches of the input data (like key indexes and groups) used by the evaluation so that concurrent evaluations in threads only read them."""
+        pass
+
     def get_columns(self) -> List[str]:
         """Get a list of input column names specified in this definition."""
         definition = self.definition
@@ -1,4 +1,10 @@
 from typing import Union, Any, List, Set, Dict, Tuple, Optional
+import os
+import json
+import time
+import pickle
+import tracemalloc
+import concurrent.futures
 
 from prosto.Prosto import *
 from prosto.Table import *
@@ -6,6 +12,7 @@
 from prosto.TableOperation import *
 from prosto.ColumnOperation import *
 from prosto.Topology import *
+from prosto.Hook import *
 
 import logging
 log = logging.getLogger("prosto")
@@ -16,6 +23,9 @@ class Prosto:
 
     column_path_separator = "::"
 
+    metadata_file = "prosto.json"  # Name of the file with table metadata written by the save method
+    state_file = "operations.pkl"  # Name of the file with (pickled) state of operations written by the save method
+
     prosto_no = 0
 
     def __init__(self, id):
@@ -29,23 +39,68 @@ def __init__(self, id):
         self.columns = []
         self.operations = []
 
-        self.topology = None
+        # Indexes used for fast lookup of schema elements by their names
+        self.table_index = {}  # Table name -> table object
+        self.column_index = {}  # Table name -> dict of column name -> column object
+        self.operation_index = {}  # Table name or (table name, column name) -> list of operations generating this element
+
+        self.topology = None  # Translated topology which is reused by runs until the schema is changed
         self.incremental = False
 
+        # Metrics of operations evaluated by the last run (a list of dicts) and the number of runs
+        self.metrics = []
+        self.run_no = 0
+
+        # Function called with metrics of each operation after its evaluation (for example, to export them)
+        self.metrics_hook = None
+
+        # Hook objects called during execution (for example, for profiling or tracing)
+        self.hooks = []
+
+        # Names of tables whose data is pickled while an operation is being pickled for a worker process (None means all tables)
+        self._pickled_tables = None
+
     def __repr__(self):
         return "["+self.id+"]"
 
+    def __getstate__(self):
+        """Hooks are not passed to worker processes (they may store non-picklable objects like profilers)."""
+        state = self.__dict__.copy()
+        state["hooks"] = []
+        state["metrics_hook"] = None
+        state["_pickled_tables"] = None
+        return state
+
+    def add_hook(self, hook: Hook) -> Hook:
+        """Register a hook object which will be called during execution of the workflow."""
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook: Hook) -> Hook:
+        self.hooks.remove(hook)
+        return hook
+
     #
     # Table methods
     #
 
-    def create_table(self, table_name, attributes) -> Table:
-        """Create a new table with no operation that populates it. The table is supposed to be populated using API."""
+    def create_table(self, table_name, attributes, keys=None, storage=None, commit_size=None, commit_interval=None, path=None) -> Table:
+        """
+        Create a new table with no operation that populates it. The table is supposed to be populated using API.
+        Optional keys are attributes for which a hash index will be maintained (it is used when other tables link to this table).
+        Optional storage is "dataframe" (default), "columnar" (NumPy arrays which are faster for appending rows) or "mmap" (memory-mapped files in the directory specified by path).
+        Records appended to the table are buffered and added when the number of buffered rows reaches commit size, the oldest of them is older than commit interval (in seconds), the table is committed explicitly or the workflow is run.
+        """
 
         # Create a table definition
         table_def = {
             "id": table_name,
             "attributes": attributes,
+            "keys": keys,
+            "storage": storage,
+            "path": path,
+            "commit_size": commit_size,
+            "commit_interval": commit_interval,
         }
         table = Table(self, table_def)
         self.add_table(table)
@@ -55,7 +110,7 @@ def create_table(self, table_name, attributes) -> Table:
     def get_table(self, table_name) -> Table:
         """Find a table with the specified name"""
         if not table_name: return None
-        return next((x for x in self.tables if x.id == table_name), None)
+        return self.table_index.get(table_name)
 
     def get_tables(self, table_names) -> List[Table]:
         """Get a list of tables with the specified names"""
@@ -167,6 +222,8 @@ def remove_table(self, table_name) -> Table:
         if table is None:
             return None
         self.tables.remove(table)
+        del self.table_index[table_name]
+        self.topology = None
         return table
 
     def add_table(self, table: Table) -> Table:
@@ -176,6 +233,8 @@ def add_table(self, table: Table) -> Table:
         table_name = table.id
         self.remove_table(table_name)
         self.tables.append(table)
+        self.table_index[table_name] = table
+        self.topology = None
         return table
 
     #
@@ -194,17 +253,17 @@ def get_column(self, table_name, column_name) -> Column:
         """Find a column the specified name"""
         if not table_name: return None
         if not column_name: return None
-        return next((x for x in self.columns if x.id == column_name and x.table.id == table_name), None)
+        return self.column_index.get(table_name, {}).get(column_name)
 
     def get_columns(self, table_name, column_names=None) -> List[Column]:
         """Get a list of columns with the specified names. All columns belong to one table."""
         if not table_name: return None
+        table_columns = self.column_index.get(table_name, {})
         if not column_names:
-            all_columns = filter(lambda x: x.table.id == table_name, self.columns)
-            return all_columns
+            return list(table_columns.values())
         if isinstance(column_names, str):
             column_names = [column_names]
-        columns = filter(lambda x: x.id in column_names and x.table.id == table_name, self.columns)
+        columns = filter(lambda x: x.id in column_names, table_columns.values())
         return list(columns)
 
     def remove_column(self, table_name, column_name) -> Column:
@@ -216,6 +275,8 @@ def remove_column(self, table_name, column_name) -> Column:
         if column is None:
             return None
         self.columns.remove(column)
+        del self.column_index[table_name][column_name]
+        self.topology = None
         return column
 
     def add_column(self, column: Column) -> Column:
@@ -226,6 +287,8 @@ def add_column(self, column: Column) -> Column:
         column_name = column.id
         self.remove_column(table_name, column_name)
         self.columns.append(column)
+        self.column_index.setdefault(table_name, {})[column_name] = column
+        self.topology = None
         return column
 
     #
@@ -234,11 +297,30 @@ def add_column(self, column: Column) -> Column:
 
     def get_table_operations(self, table_name) -> List[TableOperation]:
         """Find operations which generate the specified table. Such operations have this table name in its outputs."""
-        return [x for x in self.operations if isinstance(x, TableOperation) and table_name in x.get_outputs()]
+        return list(self.operation_index.get(table_name, []))
 
     def get_column_operations(self, table_name, column_name) -> List[ColumnOperation]:
         """Find operations which generate the specified column. Such operations have this column name in its outputs as well as the specified table name (each column operation has a table field)."""
-        return [x for x in self.operations if isinstance(x, ColumnOperation) and column_name in x.get_outputs() and table_name == x.definition.get("table")]
+        return list(self.operation_index.get((table_name, column_name), []))
+
+    def add_operation(self, operation) -> Operation:
+        """Add operation and register it as a generator of its output table or columns."""
+        self.operations.append(operation)
+
+        if isinstance(operation, TableOperation):
+            keys = operation.get_outputs()
+        elif isinstance(operation, ColumnOperation):
+            table_name = operation.definition.get("table")
+            keys = [(table_name, x) for x in operation.get_outputs()]
+        else:
+            keys = []
+
+        for key in keys:
+            self.operation_index.setdefault(key, []).append(operation)
+
+        self.topology = None
+
+        return operation
 
     #
     # Table operations
@@ -247,7 +329,7 @@ def get_column_operations(self, table_name, column_name) -> List[ColumnOperation
     def populate(
             self,
             table_name, attributes,
-            func, tables=None, model=None
+            func, tables=None, model=None, keys=None, storage=None, path=None
     ) -> Table:
         """
         Create a new populate table.
@@ -255,12 +337,17 @@ def populate(
         The table will be populated with the data returned by the UDF specified as a parameter.
         The method can be used to populate source tables with the data from external data sources.
         The method can be used to process data in input tables and then these input tables have to be specified in the paraneters and their data will be passed to UDF.
+        Optional keys are attributes for which a hash index will be maintained (it is used when other tables link to this table).
+        Optional storage is "dataframe" (default), "columnar" (NumPy arrays which are faster for appending rows) or "mmap" (memory-mapped files in the directory specified by path).
         """
 
         # Create a table definition
         table_def = {
             "id": table_name,
             "attributes": attributes,
+            "keys": keys,
+            "storage": storage,
+            "path": path,
         }
         table = Table(self, table_def)
         self.add_table(table)
@@ -278,7 +365,7 @@ def populate(
             "input_length": "table",
         }
         operation = TableOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return table
 
@@ -312,7 +399,7 @@ def product(
             "tables": tables,
         }
         operation = TableOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return table
 
@@ -348,7 +435,7 @@ def filter(
             "columns": columns,
         }
         operation = TableOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return table
 
@@ -363,12 +450,14 @@ def project(
         The output table consists of all unique combinations of the specified columns in the input table.
         The columns to be used for projection are not listed in this definition.
         Instead, we specify a link column and this link column lists all columns used for projection.
+        The attributes are unique and they are indexed for linking from the input table.
         """
 
         # Create a table definition
         table_def = {
             "id": table_name,
             "attributes": attributes,
+            "keys": attributes,
         }
         table = Table(self, table_def)
         self.add_table(table)
@@ -384,7 +473,7 @@ def project(
             "link": link,
         }
         operation = TableOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return table
 
@@ -395,13 +484,14 @@ def project(
     def compute(
             self,
             name, table,
-            func, columns=None, model=None
+            func, columns=None, model=None, row_local=False
     ) -> Column:
         """
         Create a new calculate column.
 
         The output values are computed from the input values of the same row using the specified UDF.
         UDF is called one time and returns a new column with all the value computed from the input columns passed in the parameters.
+        If row local is true then each output value depends only on the input values of the same row so that UDF can be applied to chunks of rows.
         """
 
         # Create a column definition
@@ -424,22 +514,27 @@ def compute(
             "columns": columns,
             "model": model,
             "input_length": "column",
+            "row_local": row_local,
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
     def calculate(
             self,
             name, table,
-            func, columns=None, model=None
+            func, columns=None, model=None, vectorize=None
     ) -> Column:
         """
         Create a new calculate column.
 
         The output values are computed from the input values of the same row using the specified UDF.
         UDF is called as many times as there are input rows in the table and each time returns one value calculated from the input values passed in the parameters.
+
+        If vectorize is specified then UDF gets the values of input columns as separate positional arguments:
+        - True: UDF is called once with whole columns as NumPy arrays and if it fails then it is called for each row
+        - "frompyfunc": UDF is called for each row with single values via a NumPy universal function
         """
 
         # Create a column definition
@@ -462,9 +557,10 @@ def calculate(
             "columns": columns,
             "model": model,
             "input_length": "value",
+            "vectorize": vectorize,
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
@@ -501,7 +597,7 @@ def link(
             "linked_columns": linked_columns,
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
@@ -537,7 +633,7 @@ def merge(
             "columns": columns,
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
@@ -545,12 +641,15 @@ def roll(
             self,
             name, table,
             window, link,
-            func, columns=None, model=None
+            func, columns=None, model=None, data_type=None, batch=False, time=None
     ) -> Column:
         """
         Create a new rolling aggregation column.
 
         Each output value is equal to one (aggregated) value computed from several rows (window) of this table.
+        If data type is "ndarray" then the function gets a window as an array rather than series or data frame.
+        If batch is true then the function is called once for all windows which are passed as one 3-D array (windows x rows x columns) and has to return an array with one value for each window.
+        If time column is specified then window is a duration like "5min" and the window of a row includes the rows (of its group) with timestamps in the interval (t - window, t] where t is its timestamp.
         """
 
         # Create a column definition
@@ -572,15 +671,18 @@ def roll(
             # How to group
             "window": window,
             "link": link,
+            "time": time,
 
             # How to aggregate
             "function": func,
             "columns": columns,
             "model": model,
             "input_length": "column",
+            "data_type": data_type,
+            "batch": batch,
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
@@ -594,6 +696,7 @@ def aggregate(
         Create a new aggregate column.
 
         Each output value is equal to one (aggregated) value computed from several rows (group) of another (fact) table.
+        The function can be an accumulator (an object, class or name of a built-in accumulator like 'sum' or 'mean') which is evaluated incrementally.
         """
 
         # Create a column definition
@@ -626,7 +729,7 @@ def aggregate(
             "fillna_value": 0.0,  # Postprocess
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
@@ -661,7 +764,7 @@ def discretize(
             "model": model,
         }
         operation = ColumnOperation(self, operation_def)
-        self.operations.append(operation)
+        self.add_operation(operation)
 
         return column
 
@@ -670,45 +773,313 @@ def discretize(
     #
 
     def translate(self) -> Topology:
-        self.topology = Topology(self)
-        self.topology.translate()
+        """
+        Build a new topology for the current schema and store it in the context.
+        Note that the data of all tables generated by table operations is reset.
+        """
+        # Augmentation can add new elements to the schema and hence reset the current topology so we assign it after translation
+        topology = Topology(self)
+        topology.translate()
+        self.topology = topology
         return self.topology
 
-    def run(self) -> None:
-        """Execute the whole workflow."""
+    def run(self, executor="serial", max_workers=None, chunk_size=None) -> None:
+        """
+        Execute the whole workflow.
+
+        Operations within one layer of the topology do not depend on each other and can be executed concurrently depending on the executor:
+        - "serial" (default) evaluate operations one by one
+        - "thread" evaluate operations of one layer in a pool of threads
+        - "process" evaluate operations of one layer in a pool of processes (the context is pickled and hence UDFs have to be specified by name)
+        In the concurrent modes, only the evaluation of outputs is done in parallel while the outputs are written to the tables sequentially after all operations of the layer have finished.
+        In the thread mode, caches shared by the operations of a layer (key indexes and groups) are built before the layer is evaluated so that the threads only read them.
+        In the process mode, an operation is sent along with the schema and the data of only the tables it depends on, and only its output and statistics are returned.
+        Evaluation in a worker process is hence stateless: changes of the copy of the context (like caches of key indexes or groups) are lost
+        and any state of an operation has to be returned in its output and set when the output is written.
+
+        If chunk size is specified then row-local operations (calculate, discretize, link, merge and row-local compute) are evaluated and written for consecutive ranges of rows of this size.
+        The memory needed for their input and output is then bounded by the chunk size rather than by the table size.
+
+        Metrics of each evaluated operation are collected in the metrics list (see get_metrics) and passed to the metrics hook if it is set.
+        Registered hook objects (see add_hook) are called before and after the run, each operation, each UDF call and writing of each output.
+        """
         log.info("Start executing workflow '{}'.".format(self.id))
 
-        # Translate
-        self.translate()
+        if executor not in ("serial", "thread", "process"):
+            raise ValueError("Unknown executor '{}'. Possible values: 'serial', 'thread', 'process'.".format(executor))
 
-        # Execute operations in the graph
-        for layer in self.topology.layers:
-            # Execute operations in one layer
-            for op in layer:
-                operation = op.definition.get("operation")
+        # Translate only if the schema has been changed since the last translation
+        if self.topology is None:
+            self.translate()
 
-                if isinstance(op, TableOperation):
-                    outputs = op.get_outputs()
-                    log.info("===> Start table population: id '{}', type = '{}', tables {}".format(op.id, operation, outputs))
-                    op.evaluate()
-                    log.info("<=== Finish table population".format())
+        # Records appended to the tables since the previous run have to be added before evaluation
+        for tbl in self.tables:
+            tbl.data.commit()
 
-                elif isinstance(op, ColumnOperation):
-                    columns = op.get_columns()
-                    log.info("---> Start column evaluation: id = '{}', type = '{}', columns {}".format(op.id, operation, columns))
-                    op.evaluate()
-                    log.info("<--- Finish column evaluation".format())
+        self.metrics = []
+        self.run_no += 1
 
-                else:
-                    log.warning("Unknown element '{}' in the topology '{}'.".format(op.id, self.id))
+        for hook in self.hooks:
+            hook.before_run(self)
+
+        # Execute operations in the graph
+        for layer in self.topology.layers:
+            # Row-local operations are executed in chunks one after another
+            if chunk_size:
+                for op in [x for x in layer if x.is_row_local()]:
+                    start = self._start_operation(op)
+                    self._evaluate_chunked(op, chunk_size)
+                    self._finish_operation(op, start)
+                layer = [x for x in layer if not x.is_row_local()]
+
+            # Execute operations in one layer
+            if executor == "serial" or len(layer) <= 1:
+                for op in layer:
+                    start = self._start_operation(op)
+                    self._write_output(op, op.evaluate_output())
+                    self._finish_operation(op, start)
+                continue
+
+            if executor == "thread":
+                pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            else:
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+
+            # Caches shared by the operations are built before they are read by concurrent threads
+            if executor == "thread":
+                for op in layer:
+                    op.prepare()
+
+            with pool:
+                futures = []
+                for op in layer:
+                    self._start_operation(op)
+                    futures.append(pool.submit(_evaluate_operation_output, op if executor == "thread" else self._pickle_operation(op)))
+
+                # Barrier: all operations of the layer have to finish before the next layer starts
+                # Outputs are written sequentially in the order of operations so that the table data is never modified concurrently
+                for op, future in zip(layer, futures):
+                    output, op.stats, duration = future.result()
+                    start = (time.perf_counter() - duration, None)  # Wall time includes evaluation in the worker and writing
+                    self._write_output(op, output)
+                    self._finish_operation(op, start)
 
         # Clear change status of all elements
         for tbl in self.tables:
             tbl.data.clear_change_status()
             tbl.data.gc()
+            tbl.groupby = {}  # Groups will be rebuilt from new data in the next run
+
+        for hook in self.hooks:
+            hook.after_run(self)
 
         log.info("Finished executing workflow '{}'.".format(self.id))
 
+    def save(self, path) -> None:
+        """
+        Write data of all tables along with their change status to the specified directory.
+        Each table is stored in a NumPy .npz file and the metadata of all tables is stored in a JSON file.
+        State of operations (like accumulators of aggregations) is pickled to a separate file so that incremental evaluation does not recompute it after loading.
+        Records appended to table buffers are committed before saving.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        tables = {}
+        for i, tbl in enumerate(self.tables):
+            tbl.data.commit()
+
+            file_name = "table_" + str(i) + ".npz"
+            state = tbl.data.save(os.path.join(path, file_name))
+            state["file"] = file_name
+
+            tables[tbl.id] = state
+
+        with open(os.path.join(path, Prosto.metadata_file), "w") as f:
+            json.dump({"id": self.id, "tables": tables}, f, indent=4)
+
+        # State refers to the data it has been computed from by its id which is replaced by the table name
+        data_tables = {tbl.data.id: tbl.id for tbl in self.tables}
+        states = {}
+        for op in self.operations:
+            state = getattr(op, "state", None)
+            if state is not None:
+                states[self._get_operation_key(op)] = dict(state, data=data_tables.get(state.get("data")))
+
+        with open(os.path.join(path, Prosto.state_file), "wb") as f:
+            pickle.dump(states, f)
+
+    def load(self, path) -> None:
+        """
+        Read data of tables along with their change status from the specified directory written by the save method.
+        The workflow must have the same tables (with the same names) as the saved one.
+        The workflow is translated before loading because translation creates new (empty) data for the tables populated by operations.
+        After loading, incremental evaluation continues from the saved change status and the saved state of operations.
+        """
+        if self.topology is None:
+            self.translate()
+
+        with open(os.path.join(path, Prosto.metadata_file), "r") as f:
+            metadata = json.load(f)
+
+        for table_name, state in metadata.get("tables", {}).items():
+            tbl = self.get_table(table_name)
+            if tbl is None:
+                raise ValueError("Table '{}' from the saved workflow does not exist in workflow '{}'.".format(table_name, self.id))
+
+            tbl.data.load(os.path.join(path, state["file"]), state)
+
+        state_file = os.path.join(path, Prosto.state_file)
+        if not os.path.exists(state_file):
+            return
+        with open(state_file, "rb") as f:
+            states = pickle.load(f)
+
+        for op in self.operations:
+            state = states.get(self._get_operation_key(op))
+            if state is None:
+                continue
+            tbl = self.get_table(state.get("data"))
+            op.state = dict(state, data=tbl.data.id if tbl is not None else None)
+
+    def _get_operation_key(self, op) -> str:
+        """Name of the operation which is the same in all workflows with the same definitions (unlike generated operation ids)."""
+        return Prosto.column_path_separator.join([str(op.definition.get("table"))] + op.get_outputs())
+
+    def _evaluate_chunked(self, op, chunk_size) -> None:
+        """Evaluate a row-local operation and write its output for consecutive ranges of rows of the specified size."""
+        data = self.get_table(op.definition.get("table")).data
+        full_range = data.added_range if self.incremental and op.is_incremental() else data.id_range()
+
+        if full_range.end <= full_range.start:
+            op.evaluate()  # No rows but output columns still have to be created
+            return
+
+        for start in range(full_range.start, full_range.end, chunk_size):
+            chunk_range = Range(start, min(start + chunk_size, full_range.end))
+            output = op.evaluate_output(chunk_range)
+            self._write_output(op, output)
+
+    def _pickle_operation(self, op) -> bytes:
+        """Pickle the operation for evaluation in a worker process. Only tables it depends on and its output table are pickled with their data."""
+        tables = set(op.get_dependencies_names().keys())
+        tables.update([op.definition.get("table")] + op.get_outputs())
+
+        self._pickled_tables = tables
+        try:
+            return pickle.dumps(op)
+        finally:
+            self._pickled_tables = None
+
+    def get_metrics(self) -> pd.DataFrame:
+        """
+        Return a report with metrics of the operations evaluated by the last run (one row for each operation in the order of evaluation):
+        - wall_time: evaluation and writing time in seconds
+        - rows_read and rows_written: number of input rows and number of written output rows
+        - bytes_written: size of the written output data
+        - bytes_allocated: peak memory allocated during the evaluation if tracemalloc is tracing and the operation is evaluated in the main thread (before Python 3.9, memory retained after the evaluation)
+        - udf_calls: number of calls of the user-defined function
+        """
+        columns = ["run", "operation", "type", "outputs", "wall_time", "rows_read", "rows_written", "bytes_written", "bytes_allocated", "udf_calls"]
+        return pd.DataFrame(self.metrics, columns=columns)
+
+    def _write_output(self, op, output) -> None:
+        """Write the output of the operation and count the written rows and bytes in its statistics."""
+        out = output[0] if isinstance(output, tuple) else output  # Column operations return output data along with id range
+        if isinstance(out, (pd.DataFrame, pd.Series)):
+            op.stats["rows_written"] += len(out)
+            op.stats["bytes_written"] += int(np.sum(out.memory_usage(index=False)))
+
+        for hook in self.hooks:
+            hook.on_write(op, output)
+
+        op.write_output(output)
+
+    def _start_operation(self, op) -> tuple:
+        """Log the start of the operation, call hooks and start collecting its statistics. Return start time and traced memory (None if not tracing)."""
+        self._log_start(op)
+        op.reset_stats()
+
+        for hook in self.hooks:
+            hook.before_operation(op)
+
+        memory = None
+        if tracemalloc.is_tracing():
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            memory = tracemalloc.get_traced_memory()[0]
+
+        return time.perf_counter(), memory
+
+    def _finish_operation(self, op, start) -> dict:
+        """Store metrics of the evaluated operation, pass them to the hooks and log the finish."""
+        start_time, start_memory = start
+        wall_time = time.perf_counter() - start_time
+
+        bytes_allocated = None
+        if start_memory is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if hasattr(tracemalloc, "reset_peak"):
+                bytes_allocated = peak - start_memory
+            else:  # Peak cannot be reset so only the memory still allocated after the evaluation is measured
+                bytes_allocated = current - start_memory
+
+        metrics = {
+            "run": self.run_no,
+            "operation": op.id,
+            "type": op.operation,
+            "outputs": op.get_outputs(),
+            "wall_time": wall_time,
+            "rows_read": op.stats["rows_read"],
+            "rows_written": op.stats["rows_written"],
+            "bytes_written": op.stats["bytes_written"],
+            "bytes_allocated": bytes_allocated,
+            "udf_calls": op.stats["udf_calls"],
+        }
+        self.metrics.append(metrics)
+
+        self._log_finish(op, wall_time)
+
+        for hook in self.hooks:
+            hook.after_operation(op, metrics)
+
+        if self.metrics_hook is not None:
+            self.metrics_hook(metrics)
+
+        return metrics
+
+    def _log_start(self, op) -> None:
+        operation = op.definition.get("operation")
+
+        if isinstance(op, TableOperation):
+            outputs = op.get_outputs()
+            log.info("===> Start table population: id '{}', type = '{}', tables {}".format(op.id, operation, outputs))
+
+        elif isinstance(op, ColumnOperation):
+            columns = op.get_columns()
+            log.info("---> Start column evaluation: id = '{}', type = '{}', columns {}".format(op.id, operation, columns))
+
+        else:
+            log.warning("Unknown element '{}' in the topology '{}'.".format(op.id, self.id))
+
+    def _log_finish(self, op, wall_time) -> None:
+        if isinstance(op, TableOperation):
+            log.info("<=== Finish table population: {:.3f} seconds".format(wall_time))
+
+        elif isinstance(op, ColumnOperation):
+            log.info("<--- Finish column evaluation: {:.3f} seconds".format(wall_time))
+
+
+def _evaluate_operation_output(op):
+    """
+    Evaluate the output of the operation in a worker. In a worker process, the operation and its context are a pickled copy (see Prosto._pickle_operation).
+    Return the output along with statistics of the evaluation and its duration (statistics of a copy are not visible in the main process).
+    """
+    if isinstance(op, bytes):
+        op = pickle.loads(op)
+    op.reset_stats()
+    start_time = time.perf_counter()
+    output = op.evaluate_output()
+    return output, op.stats, time.perf_counter() - start_time
 
 if __name__ == "__main__":
     pass
@@ -6,6 +6,8 @@
 from prosto.Prosto import *
 from prosto.Column import *
 from prosto.Data import *
+from prosto.ColumnarData import *
+from prosto.MappedData import *
 
 
 class Table:
@@ -32,7 +34,7 @@ def __init__(self, prosto, definition):
         self.definition = definition
 
         # Here we store the real (physical) data for this table (all its attributes and columns)
-        self.data = Data(self)
+        self.data = self.create_data()
 
         # A mapping from (link) column/attribute names to the corresponding groupby objects
         self.groupby = {}
@@ -41,12 +43,41 @@ def __init__(self, prosto, definition):
     def __repr__(self):
         return "["+self.id+"]"
 
+    def __getstate__(self):
+        """Data is not pickled if the table is not needed by the operation which is being pickled for a worker process. Groups are not pickled."""
+        state = self.__dict__.copy()
+        pickled_tables = getattr(self.prosto, "_pickled_tables", None)
+        if pickled_tables is not None and self.id not in pickled_tables:
+            state["data"] = None
+        state["groupby"] = {}
+        return state
+
+    def create_data(self) -> Data:
+        """Create a new (empty) data object for this table according to the storage specified in its definition."""
+        storage = self.definition.get("storage")
+        if not storage or storage == "dataframe":
+            return Data(self)
+        elif storage == "columnar":
+            return ColumnarData(self)
+        elif storage == "mmap":
+            return MappedData(self)
+        else:
+            raise ValueError("Unknown storage '{}' for table '{}'.".format(storage, self.id))
+
     def get_df(self) -> pd.DataFrame:
         return self.data.get_df()
 
     def get_column_series(self, column_name) -> pd.Series:
         return self.get_df()[column_name]
 
+    def append(self, records) -> int:
+        """Put records into the write buffer of the table data. They will be added when the buffer is committed."""
+        return self.data.append(records)
+
+    def commit(self) -> int:
+        """Add all buffered records to the table data."""
+        return self.data.commit()
+
     #
     # Column getters
     #
@@ -77,7 +108,7 @@ def _get_or_create_groupby(self, link_column_name):
         # Use link column (with target row ids) to build a groupby object (it will build a group for each target row id)
         try:
             # Option 1:
-            gb = self.get_df().groupby(link_column_name, sort=False, as_index=True)
+            gb = self.data.get_full_slice(self.data.get_column_names()).groupby(link_column_name, sort=False, as_index=True)  # Removed rows are excluded
             # Option 2:
             #gb = self.get_data().groupby([link_column_name], sort=False, as_index=False)
             # Option 3: group by index - grouping column will be retained via index
@@ -85,6 +85,38 @@ def get_dependencies_names(self) -> dict:
 
     def evaluate(self) -> None:
         """Execute this operation by populating the output table. Only attribute columns are filled with values."""
+        output = self.evaluate_output()
+        self.write_output(output)
+
+    def prepare(self) -> None:
+        """Extend the key index of the source table used by projection."""
+        definition = self.definition
+        if not definition.get("operation", "UNKNOWN").lower().startswith("proj"):
+            return
+
+        tables = self.prosto.get_tables(self.get_tables())
+        link_column_ops = self.prosto.get_column_operations(tables[0].id, definition.get("link")) if tables else None
+        if link_column_ops:
+            source_keys = link_column_ops[0].get_columns()
+            if tables[0].data.has_key_index(source_keys):
+                tables[0].data.get_key_index(source_keys)
+
+    def write_output(self, output) -> None:
+        """Replace all rows of the output table with the new data returned by the evaluation (None means no changes)."""
+        if output is None:
+            return
+
+        outputs = self.get_outputs()
+        output_table = self.prosto.get_table(outputs[0])
+
+        # All existing rows are physically deleted (rather than marked as removed) because the new rows do not depend on them
+        # It is equivalent to populating a newly allocated table but the data object is retained
+        output_table.data.reset()
+        output_table.data.add(output)
+        output_table.groupby = {}
+
+    def evaluate_output(self):
+        """Evaluate the new data of the output table without adding it to the table."""
         definition = self.definition
         operation = definition.get("operation", "UNKNOWN")
 
@@ -120,9 +152,10 @@ def evaluate(self) -> None:
         else:
             raise ValueError("Unknown operation type '{}' in the definition of table '{}'.".format(operation, self.id))
 
-        if new_data is not None:
-            output_table.data.remove_all()
-            output_table.data.add(new_data)
+        # All rows of the input tables are read
+        self.stats["rows_read"] += sum([t.data.length() for t in self.prosto.get_tables(self.get_tables())])
+
+        return new_data
 
     def _evaluate_populate_row(self):
         """The function is applied to one row (from an input table) and generates a sub-table which will be appnded to the result."""
@@ -143,6 +176,7 @@ def _evaluate_populate_table(self):
         func = resolve_full_name(func_name)
         if not func:
             raise ValueError("Cannot resolve user-defined function '{}'. Skip table definition.".format(func_name))
+        func = self._wrap_udf(func)
 
         #
         # Stage 2. Prepare input data
@@ -295,7 +329,6 @@ def _evaluate_project(self):
         tables = self.prosto.get_tables(tables)
 
         source_table = tables[0]
-        source_table_data = source_table.get_df()
 
         #
         # Stage 2. Find link column
@@ -313,7 +346,7 @@ def _evaluate_project(self):
         link_column_ops = self.prosto.get_column_operations(source_table.id, link_column.id)
         link_column_op = link_column_ops[0]
         source_keys = link_column_op.get_columns()
-        if not all_columns_exist(source_keys, source_table_data):
+        if not source_table.data.all_columns_exist(source_keys):
             raise ValueError("Not all key columns available in the link column definition.".format())
 
         # Find this (target) table attributes to be created
@@ -336,7 +369,14 @@ def _evaluate_project(self):
         df = df.groupby(by=["C1", "C2", "C3"], as_index=False).first()  # Using groupby
         np.unique(df[["col1", "col2"]], axis=0)  # Not for object data (error for object types)
         """
-        out = source_table.data.get_df().drop_duplicates(subset=source_keys)  # Really do projection
+        if source_table.data.has_key_index(source_keys):
+            # Each key of the index references the first row with this combination of values
+            key_index = source_table.data.get_key_index(source_keys)
+            removed_end = source_table.data.removed_range.end
+            ids = sorted(x for x in key_index.values() if x >= removed_end)
+            out = source_table.data.get_rows(ids, source_keys)
+        else:
+            out = source_table.data.get_full_slice(source_keys).drop_duplicates(subset=source_keys)  # Really do projection
 
         #
         # Stage 5. Index and renamings
@@ -2,6 +2,7 @@
 import copy
 
 from prosto.utils import *
+from prosto.resolve import *
 
 import prosto as pr  # To resolve circular imports
 from prosto.Prosto import *
@@ -33,62 +34,79 @@ def translate(self) -> None:
         #
         self.augment(all_operations)
 
+        #
+        # Resolve functions of operations once (they are cached) rather than in each evaluation
+        #
+        for op in self.prosto.operations:
+            func_name = op.definition.get("function")
+            if isinstance(func_name, str) and not get_native_function_name(func_name):
+                try:
+                    resolve_full_name(func_name)
+                except ValueError:
+                    pass  # The error is reported when the operation is evaluated
+
         #
         # Build graph of operations by analyzing dependencies
         #
 
         all_operations = [x for x in self.prosto.operations]
 
-        # Empty collection of already processed elements (they can be simultaneously removed from all)
-        done = []
+        # For each operation, find operations it depends on (which generate its dependency elements) and operations which depend on it
+        dependents = {op: [] for op in all_operations}  # Operation -> list of operations which depend on it
+        in_degree = {}  # Operation -> number of (distinct) operations it depends on and which have not been added to layers yet
+        for op in all_operations:
+
+            #
+            # Find dependencies of this operation
+            #
+            if isinstance(op, TableOperation):
+                deps = op.get_dependency_objects()
+            elif isinstance(op, ColumnOperation):
+                deps = op.get_dependency_objects()
+            else:
+                raise ValueError("Operation '{}' with unknown class found while building topology.".format(op.id))
+
+            #
+            # Find operations which generate these elements
+            #
+            dep_ops = set()
+            for dep in deps:
+                if isinstance(dep, Table):
+                    ops = self.prosto.get_table_operations(dep.id)
+                elif isinstance(dep, Column):
+                    ops = self.prosto.get_column_operations(dep.table.id, dep.id)
+                else:
+                    raise ValueError("Element '{}' with unknown class found while building topology (only Table and Column are possible).".format(dep.id))
+                    #ops = []
+                dep_ops.update(ops)
+
+            in_degree[op] = len(dep_ops)
+            for dep_op in dep_ops:
+                dependents[dep_op].append(op)
 
         # Topology to be built is a list of layers in the order of execution of their operations.
         # First layer does not have dependencies. Second layer depends on the operations in the first layer and so on.
+        # Each next layer consists of operations all dependencies of which are in previous layers (their in-degree becomes 0)
+        position = {op: i for i, op in enumerate(all_operations)}  # Operations within one layer are ordered as they were added
         layers = []
-        while True:
-            layer = []  # List of operations which depend on only operations in some previous layers
-
-            # We will build this new layer from the available (not added to previous layers) operations
-            for op in all_operations:
-
-                if op in done:
-                    continue
-
-                #
-                # Find dependencies of this operation
-                #
-                if isinstance(op, TableOperation):
-                    deps = op.get_dependency_objects()
-                elif isinstance(op, ColumnOperation):
-                    deps = op.get_dependency_objects()
-                else:
-                    raise ValueError("Operation '{}' with unknown class found while building topology.".format(op.id))
-
-                #
-                # Find operations which generate these elements
-                #
-                dep_ops = []
-                for dep in deps:
-                    if isinstance(dep, Table):
-                        ops = self.prosto.get_table_operations(dep.id)
-                    elif isinstance(dep, Column):
-                        ops = self.prosto.get_column_operations(dep.table.id, dep.id)
-                    else:
-                        raise ValueError("Element '{}' with unknown class found while building topology (only Table and Column are possible).".format(dep.id))
-                        #ops = []
-                    dep_ops.extend(ops)
+        layer = [op for op in all_operations if in_degree[op] == 0]
+        while layer:
+            layers.append(layer)
 
-                #
-                # If all dependencies have been processed (belong to previous layers) then add this element to the current layer
-                #
-                if set(dep_ops) <= set(done):
-                    layer.append(op)
+            next_layer = []
+            for op in layer:
+                for dep_op in dependents[op]:
+                    in_degree[dep_op] -= 1
+                    if in_degree[dep_op] == 0:
+                        next_layer.append(dep_op)
+            next_layer.sort(key=lambda x: position[x])
 
-            if len(layer) == 0:
-                break
+            layer = next_layer
 
-            layers.append(layer)
-            done.extend(layer)
+        # Operations which have not been added to any layer either belong to a cycle or depend on such operations
+        unresolved = [op for op in all_operations if in_degree[op] > 0]
+        if unresolved:
+            raise ValueError("Cannot build topology because of cyclic dependencies. Operations not added to the topology: {}".format(unresolved))
 
         # Layers of operations
         self.layers = layers
@@ -106,7 +124,7 @@ def translate(self) -> None:
 
                     # Allocate/initialize data and other resources
                     for tab in tables:
-                        tab.data = Data(tab)
+                        tab.data = tab.create_data()
 
                 elif isinstance(op, ColumnOperation):  # Find column
                     table_name = op.definition.get("table")
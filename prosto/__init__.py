@@ -3,3 +3,7 @@
 from prosto.Table import Table
 from prosto.Column import Column
 from prosto.Topology import Topology
+from prosto.Accumulator import Accumulator
+from prosto.ColumnarData import ColumnarData
+from prosto.MappedData import MappedData
+from prosto.Hook import Hook, ProfileHook, TraceHook
@@ -0,0 +1,204 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import functools
+
+import pandas as pd
+import numpy as np
+
+import prosto as pr
+from prosto.Prosto import *
+
+import logging
+log = logging.getLogger("prosto.bench")
+
+
+"""
+Benchmarks of operations evaluated on synthetic star schemas.
+
+Each benchmark creates a workflow with a fact table (group key G and measure M), a group table (key G and measure W)
+and one benchmarked operation (along with the operations it depends on), and measures the wall time of this operation reported in the run metrics.
+In full mode, the workflow is run once for all rows. In incremental mode, the workflow is run for all rows and then the time of the second run
+evaluating only a batch of added fact rows is measured.
+"""
+
+operations = ["populate", "product", "filter", "project", "calculate", "compute", "link", "merge", "roll", "aggregate", "discretize"]
+modes = ["full", "incremental"]
+
+
+def generate_facts(rows, groups, seed=0) -> pd.DataFrame:
+    """Generate fact rows with random group keys and measures."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"G": rng.integers(0, groups, rows), "M": rng.random(rows)})
+
+
+def generate_groups(groups, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"G": np.arange(groups), "W": rng.random(groups)})
+
+
+def create_workflow(operation, rows, groups, storage=None, seed=0) -> Prosto:
+    """Create a star schema with the benchmarked operation which generates the 'Output' table or column."""
+    sch = Prosto("Benchmark")
+
+    sch.create_table(table_name="Facts", attributes=["G", "M"], storage=storage)
+    sch.create_table(table_name="Groups", attributes=["G", "W"], keys=["G"], storage=storage)
+
+    if operation == "populate":
+        sch.populate(
+            table_name="Output", attributes=["G", "M"],
+            func=functools.partial(generate_facts, rows, groups, seed), tables=[], storage=storage,
+        )
+    elif operation == "product":
+        # The product of the groups and a table of rows/groups records has (approximately) the same number of rows as the fact table
+        sch.create_table(table_name="Sides", attributes=["S"], storage=storage)
+        sch.product(table_name="Output", attributes=["g", "s"], tables=["Groups", "Sides"])
+    elif operation == "filter":
+        sch.calculate(name="Flag", table="Facts", func="lambda x: x > 0.5", columns=["M"], vectorize=True)
+        sch.filter(table_name="Output", attributes=["super"], func=None, tables=["Facts"], columns=["Flag"])
+    elif operation == "project":
+        sch.project(table_name="Output", attributes=["X"], link="Link", tables=["Facts"])
+        sch.link(name="Link", table="Facts", type="Output", columns=["G"], linked_columns=["X"])
+    elif operation == "calculate":
+        sch.calculate(name="Output", table="Facts", func="lambda x: x * 2.0", columns=["M"])
+    elif operation == "compute":
+        sch.compute(name="Output", table="Facts", func="lambda x: x * 2.0", columns=["M"])
+    elif operation == "link":
+        sch.link(name="Output", table="Facts", type="Groups", columns=["G"], linked_columns=["G"])
+    elif operation == "merge":
+        sch.link(name="Link", table="Facts", type="Groups", columns=["G"], linked_columns=["G"])
+        sch.merge(name="Output", table="Facts", columns=["Link", "W"])
+    elif operation == "roll":
+        sch.roll(name="Output", table="Facts", window="10", link=None, func="sum", columns=["M"])
+    elif operation == "aggregate":
+        sch.link(name="Link", table="Facts", type="Groups", columns=["G"], linked_columns=["G"])
+        sch.aggregate(name="Output", table="Groups", tables=["Facts"], link="Link", func="sum", columns=["M"])
+    elif operation == "discretize":
+        sch.discretize(name="Output", table="Facts", columns=["M"], model={"origin": 0.0, "step": 0.1})
+    else:
+        raise ValueError("Unknown operation '{}'. Possible values: {}.".format(operation, ", ".join(operations)))
+
+    sch.get_table("Facts").data.add(generate_facts(rows, groups, seed))
+    sch.get_table("Groups").data.add(generate_groups(groups, seed))
+    if operation == "product":
+        sch.get_table("Sides").data.add(pd.DataFrame({"S": np.arange(max(rows // groups, 1))}))
+
+    return sch
+
+
+def run_benchmark(operation, rows, mode="full", groups=100, batch=0.01, storage=None, seed=0) -> dict:
+    """
+    Measure one evaluation of the operation on a star schema with the specified number of fact rows.
+    In incremental mode, the measured run evaluates a batch of added fact rows (batch is a fraction of rows).
+    Return the metrics of the benchmarked operation along with the time of the whole measured run.
+    """
+    if mode not in modes:
+        raise ValueError("Unknown mode '{}'. Possible values: {}.".format(mode, ", ".join(modes)))
+
+    sch = create_workflow(operation, rows, groups, storage, seed)
+
+    if mode == "incremental":
+        sch.incremental = True
+        sch.run()
+        sch.get_table("Facts").data.add(generate_facts(max(int(rows * batch), 1), groups, seed + 1))
+
+    start_time = time.perf_counter()
+    sch.run()
+    run_time = time.perf_counter() - start_time
+
+    metrics = [x for x in sch.metrics if "Output" in x["outputs"]][0]
+
+    return {
+        "operation": operation,
+        "mode": mode,
+        "rows": rows,
+        "time": metrics["wall_time"],
+        "run_time": run_time,
+        "rows_read": metrics["rows_read"],
+        "rows_written": metrics["rows_written"],
+        "udf_calls": metrics["udf_calls"],
+    }
+
+
+def run_benchmarks(rows=(10000,), operations=operations, modes=modes, repeat=3, groups=100, batch=0.01, storage=None, seed=0) -> dict:
+    """
+    Run benchmarks of the specified operations for each number of rows and mode and return a report (a dict which can be serialized to JSON).
+    Each benchmark is repeated and its minimum time is reported along with the times of all repetitions.
+    """
+    results = []
+    for n in rows:
+        for operation in operations:
+            for mode in modes:
+                measurements = [run_benchmark(operation, int(n), mode, groups, batch, storage, seed) for i in range(repeat)]
+                result = min(measurements, key=lambda x: x["time"])
+                result["times"] = [x["time"] for x in measurements]
+                results.append(result)
+
+                log.info("Benchmark '{}' ({}, {} rows): {:.6f} seconds".format(operation, mode, int(n), result["time"]))
+
+    return {
+        "version": pr.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "parameters": {"repeat": repeat, "groups": groups, "batch": batch, "storage": storage, "seed": seed},
+        "results": results,
+    }
+
+
+def main(args = None):
+    if not args: args = sys.argv[1:]
+
+    programVersion = "Version " + pr.__version__
+    programDescription = "Prosto benchmarks " + programVersion
+
+    parser = argparse.ArgumentParser(description=programDescription)
+    parser.add_argument("-v", "--version", action="version", version=programVersion)
+
+    parser.add_argument("-l", "--log", dest="loglevel", required=False, choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], default="INFO", help="Set the logging level (default INFO)")
+
+    parser.add_argument("-r", "--rows", type=float, nargs="+", default=[1e4], help="Numbers of fact rows (default 1e4)")
+    parser.add_argument("-p", "--operations", nargs="+", choices=operations, default=operations, help="Benchmarked operations (default all)")
+    parser.add_argument("-m", "--modes", nargs="+", choices=modes, default=modes, help="Evaluation modes (default all)")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="Number of repetitions of each benchmark (default 3)")
+    parser.add_argument("-g", "--groups", type=int, default=100, help="Number of groups (default 100)")
+    parser.add_argument("-b", "--batch", type=float, default=0.01, help="Added rows in incremental mode as a fraction of fact rows (default 0.01)")
+    parser.add_argument("-s", "--storage", choices=["dataframe", "columnar"], default=None, help="Storage of tables (default dataframe)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of random data (default 0)")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Output JSON file (default standard output)")
+
+    arguments = parser.parse_args(args)
+
+    # Configure logging. Messages of workflow runs are shown only at the DEBUG level because they would dominate the output
+    logging.basicConfig(stream=sys.stderr, level=arguments.loglevel, format="%(asctime)s - %(name)s - %(levelname)s: %(message)s")
+    if arguments.loglevel == "INFO":
+        logging.getLogger("prosto").setLevel(logging.WARNING)
+        log.setLevel(logging.INFO)
+
+    report = run_benchmarks(
+        rows=arguments.rows, operations=arguments.operations, modes=arguments.modes, repeat=arguments.repeat,
+        groups=arguments.groups, batch=arguments.batch, storage=arguments.storage, seed=arguments.seed,
+    )
+
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump(report, f, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+
+    logging.shutdown()
+
+    return 0
+
+if __name__ == "__main__":
+
+    exitcode = main(sys.argv[1:])
+
+    if(not exitcode):
+        exit()
+    else:
+        exit(exitcode)
@@ -1,18 +1,218 @@
 import os
 import sys
+import io
+import json
+import time
 import argparse
 
+import pandas as pd
+import numpy as np
+
+try:
+    import yaml  # Optional. Workflow definitions can be written in YAML if it is installed
+except ImportError:
+    yaml = None
+
 import prosto as pr
-#from prosto.Prosto import *
+from prosto.Prosto import *
+from prosto.resolve import *
 
 import logging
 log = logging.getLogger("prosto")
 
 
-def run(script_file):
+"""
+Workflow definition (JSON or YAML) consists of the following (optional) sections:
+- "id": workflow name
+- "imports": a list of modules with UDFs which are imported before the workflow is created (names are resolved relative to the definition file)
+- "incremental": whether the workflow is evaluated incrementally (default is true when watching source files)
+- "tables": a list of tables where each table is specified by arguments of Prosto.create_table and optionally a "source" CSV file with its rows
+- "operations": a list of operations where each operation is specified by its type ("operation") and arguments of the corresponding Prosto method
+
+For example:
+{
+    "imports": ["udfs"],
+    "tables": [{"table_name": "Facts", "attributes": ["A", "M"], "source": "facts.csv"}],
+    "operations": [{"operation": "calculate", "name": "M2", "table": "Facts", "func": "udfs:double", "columns": ["M"]}]
+}
+"""
+
+# Operation types which can be used in workflow definitions (they are names of Prosto methods)
+operations = ["populate", "product", "filter", "project", "compute", "calculate", "link", "merge", "roll", "aggregate", "discretize"]
+
+
+class SourceFile:
+    """
+    The class represents a CSV file with rows of a table. Rows appended to the file after the previous read are read by the next read.
+    Only complete lines (ending with a newline) are read so that a line which is being written is read later.
+    Read rows are appended to the write buffer of the table so that they are added when it is committed (by size, time or workflow run).
+    Column types are determined by the first read rows and later rows are parsed with the same types.
+    """
+
+    def __init__(self, table, path):
+        self.table = table
+        self.path = path
+        self.header = None
+        self.dtypes = None  # Column name -> type of the first read rows
+        self.offset = 0  # Position after the last read line
+
+    def has_new_rows(self) -> bool:
+        return os.path.exists(self.path) and os.path.getsize(self.path) > self.offset
+
+    def read(self) -> int:
+        """Append new rows of the file to the table and return their number."""
+        if not self.has_new_rows():
+            return 0
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1  # Incomplete last line is not read
+        if end == 0:
+            return 0
+        self.offset += end
+        text = data[:end].decode()
+
+        if self.header is None:
+            header_end = text.find("\n") + 1
+            self.header = text[:header_end]
+            text = text[header_end:]
+        if not text.strip():
+            return 0
+
+        df = self._parse(self.header + text)
+        self.table.append(df)
+
+        return len(df)
+
+    def _parse(self, text) -> pd.DataFrame:
+        """
+        Parse rows with the types of the first read rows.
+        Types of columns which cannot be parsed with them are widened: integers to floats (for missing values) and other types to objects (for example, for text).
+        """
+        if self.dtypes is None:
+            df = pd.read_csv(io.StringIO(text))
+            self.dtypes = df.dtypes.to_dict()
+            return df
+
+        try:
+            return pd.read_csv(io.StringIO(text), dtype=self.dtypes)
+        except ValueError:
+            pass
+
+        for name, dtype in self.dtypes.items():
+            candidates = [dtype, np.dtype(np.float64), np.dtype(object)] if dtype.kind in "iu" else [dtype, np.dtype(object)]
+            for candidate in candidates:
+                try:
+                    pd.read_csv(io.StringIO(text), usecols=[name], dtype={name: candidate})
+                    break
+                except ValueError:
+                    continue
+            if candidate != dtype:
+                log.warning("Type of column '{}' in source file '{}' has been widened from {} to {}.".format(name, self.path, dtype, candidate))
+                self.dtypes[name] = candidate
+
+        return pd.read_csv(io.StringIO(text), dtype=self.dtypes)
+
+
+def load_definition(file) -> dict:
+    """Read workflow definition from a JSON or YAML file."""
+    with open(file, "r") as f:
+        if file.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML is required to read workflow definition '{}'.".format(file))
+            return yaml.safe_load(f)
+        return json.load(f)
+
 
-    # TODO: Not implemented
-    log.error("Script execution is not implemented.".format())
+def create_workflow(definition, base_dir=".") -> Tuple[Prosto, List[SourceFile]]:
+    """Create a workflow from its definition (a dict) and return it along with source files of its tables (relative to the base directory)."""
+
+    # Modules with UDFs are imported relative to the definition file
+    imports = definition.get("imports", [])
+    if imports:
+        if base_dir not in sys.path:
+            sys.path.insert(0, base_dir)
+        modules = import_modules(imports)
+        if len(modules) < len(imports):
+            log.warning("Not all modules from {} have been imported.".format(imports))
+
+    sch = Prosto(definition.get("id", "Prosto"))
+    sch.incremental = bool(definition.get("incremental", False))
+
+    sources = []
+    for table_def in definition.get("tables", []):
+        table_def = dict(table_def)
+        source = table_def.pop("source", None)
+        tbl = sch.create_table(**table_def)
+        if source:
+            sources.append(SourceFile(tbl, os.path.join(base_dir, source)))
+
+    for operation_def in definition.get("operations", []):
+        operation_def = dict(operation_def)
+        operation = operation_def.pop("operation", None)
+        if operation not in operations:
+            raise ValueError("Unknown operation '{}' in the workflow definition. Possible values: {}.".format(operation, ", ".join(operations)))
+        getattr(sch, operation)(**operation_def)
+
+    return sch, sources
+
+
+def print_metrics(sch, file=None) -> None:
+    """Print timings of the operations evaluated by the last run (to standard output by default)."""
+    file = file or sys.stdout
+    report = sch.get_metrics()
+    total = report["wall_time"].sum()
+    print("Run {} of workflow '{}': {:.3f} seconds".format(sch.run_no, sch.id, total), file=file)
+
+    report["outputs"] = report["outputs"].str.join(", ")
+    columns = ["type", "outputs", "wall_time", "rows_read", "rows_written", "udf_calls"]
+    print(report[columns].to_string(index=False), file=file)
+    file.flush()
+
+
+def watch(sch, sources, interval=1.0, count=None, executor="serial") -> int:
+    """
+    Run the workflow whenever rows are appended to its source files which are checked with the specified interval (in seconds).
+    Stop after the specified number of runs (None means until interrupted). Return the number of runs.
+    """
+    runs = 0
+    try:
+        while count is None or runs < count:
+            rows = sum([x.read() for x in sources])
+            if rows == 0:  # No new (complete) lines
+                time.sleep(interval)
+                continue
+            log.info("Read {} new rows from source files.".format(rows))
+
+            sch.run(executor=executor)
+            print_metrics(sch)
+            runs += 1
+    except KeyboardInterrupt:
+        log.info("Stop watching source files.".format())
+
+    return runs
+
+
+def run(script_file, watch_files=False, interval=1.0, count=None, executor="serial"):
+    """Execute the workflow defined in the file once or each time its source files grow."""
+
+    definition = load_definition(script_file)
+    if watch_files:
+        definition.setdefault("incremental", True)  # Only new rows are evaluated after changes of the source files
+
+    base_dir = os.path.dirname(os.path.abspath(script_file))
+    sch, sources = create_workflow(definition, base_dir)
+
+    for source in sources:
+        source.read()
+
+    sch.run(executor=executor)
+    print_metrics(sch)
+
+    if watch_files:
+        watch(sch, sources, interval, None if count is None else count - 1, executor)
 
     return 0
 
@@ -27,7 +227,12 @@ def main(args = None):
 
     parser.add_argument("-l", "--log", dest="loglevel", required=False, choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], default="INFO", help="Set the logging level (default INFO)")
 
-    parser.add_argument("script_file", type=str, help="Script file name")
+    parser.add_argument("-w", "--watch", action="store_true", help="Run the workflow again (incrementally) whenever its source files grow")
+    parser.add_argument("-i", "--interval", type=float, default=1.0, help="Interval of checking source files in seconds (default 1)")
+    parser.add_argument("-n", "--count", type=int, default=None, help="Maximum number of runs in watch mode (default unlimited)")
+    parser.add_argument("-e", "--executor", choices=["serial", "thread", "process"], default="serial", help="Executor of operations (default serial)")
+
+    parser.add_argument("script_file", type=str, help="Workflow definition file (JSON or YAML)")
 
     arguments = parser.parse_args(args)
 
@@ -39,7 +244,7 @@ def main(args = None):
 
     exitcode = 1
     try:
-        exitcode = run(arguments.script_file)
+        exitcode = run(arguments.script_file, arguments.watch, arguments.interval, arguments.count, arguments.executor)
     except Exception as e:
         log.error("Error executing script file {}.".format(arguments.script_file))
         log.exception(e)
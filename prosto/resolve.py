@@ -15,10 +15,20 @@
 Function resolution.
 """
 
+# Resolved functions (function specification -> function reference) and imported modules (module name -> module)
+function_cache = {}
+module_cache = {}
+
+def clear_cache() -> None:
+    """Remove all resolved functions and imported modules from the cache, for example, after modules have been changed and reloaded."""
+    function_cache.clear()
+    module_cache.clear()
+
 def resolve_full_name(full_name):
     """
     Resolve the specified name or definition of the function to a reference.
     Fully qualified name consists of module name and function name separated by a colon, for example:  'mod1.mod2.mod3:class1.class2.func1.func2'.
+    Resolved functions (compiled lambdas and functions found in modules) are cached so that the same specification is resolved only once.
     """
 
     if not full_name:
@@ -27,7 +37,16 @@ def resolve_full_name(full_name):
     elif isinstance(full_name, (types.FunctionType, types.BuiltinFunctionType, functools.partial)):
         return full_name
 
-    elif full_name.strip().startswith('lambda '):
+    func = function_cache.get(full_name)
+    if func is None:
+        func = _resolve_full_name(full_name)
+        if func is not None:  # Names which cannot be resolved now can be resolved later (after importing their modules)
+            function_cache[full_name] = func
+
+    return func
+
+def _resolve_full_name(full_name):
+    if full_name.strip().startswith('lambda '):
         try:
             func = eval(full_name)
         except Exception as e:
@@ -100,10 +119,14 @@ def resolve_name_in_mod(func_name: str, mod):
     return last_segment
 
 def import_modules(imports):
+    """Import modules with the specified names (or source files relative to the current directory). Imported modules are cached."""
     modules = []
 
     for mod_name in imports:
-        mod = None
+        mod = module_cache.get(mod_name)
+        if mod:
+            modules.append(mod)
+            continue
         try:
             mod = importlib.import_module(mod_name)
         except ImportError as ie:
@@ -111,6 +134,7 @@ def import_modules(imports):
 
         if mod:
             modules.append(mod)
+            module_cache[mod_name] = mod
             continue  # Module found and imported
 
         # Try to import from source file
@@ -127,6 +151,7 @@ def import_modules(imports):
         if mod:
             modules.append(mod)
             sys.modules[mod_name] = mod
+            module_cache[mod_name] = mod
             continue
 
         #log.warning(f"Cannot import module '{mod_name}'. Ignored. This can cause errors later if its functions are used in the workflow")
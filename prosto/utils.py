@@ -97,6 +97,19 @@ def get_all_columns(df) -> List[str]:
     else:
         return None
 
+#
+# Functions
+#
+
+# Aggregation functions which can be specified by name and are evaluated by the corresponding (vectorized) pandas methods
+native_functions = ["sum", "mean", "count", "min", "max", "std", "var", "median"]
+
+def get_native_function_name(func) -> Optional[str]:
+    """Return the name of the built-in aggregation function if the specified function is its name or None otherwise."""
+    if isinstance(func, str) and func.strip() in native_functions:
+        return func.strip()
+    return None
+
 def all_columns_exist(names, df) -> bool:
     all_columns_available = True
     for col in names:
@@ -108,5 +121,23 @@ def all_columns_exist(names, df) -> bool:
     return True
 
 
+#
+# Arrays
+#
+
+def sliding_windows(values, window_size) -> np.ndarray:
+    """
+    Return a read-only view of all windows of consecutive rows of the 2-D array (windows x rows x columns) without copying its data.
+    sliding_window_view is used if it is available (numpy>=1.20) and otherwise the view is created with as_strided.
+    """
+    if hasattr(np.lib.stride_tricks, "sliding_window_view"):
+        return np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0).transpose(0, 2, 1)
+
+    count = max(values.shape[0] - window_size + 1, 0)
+    shape = (count, window_size) + values.shape[1:]
+    strides = (values.strides[0],) + values.strides
+    return np.lib.stride_tricks.as_strided(values, shape=shape, strides=strides, writeable=False)
+
+
 if __name__ == "__main__":
     pass
@@ -34,10 +34,18 @@
     # dependencies
     install_requires=[
         'numpy',
-        'pandas',
+        'pandas>=1.0',
     ],
     zip_safe=True,
 
+    # command line tools
+    entry_points={
+        'console_scripts': [
+            'prosto=prosto.main:main',
+            'prosto-bench=prosto.bench:main',
+        ],
+    },
+
     # package content (what to include)
     packages=setuptools.find_packages(),
     #packages=setuptools.find_packages(exclude=("tests",)),
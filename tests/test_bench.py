@@ -0,0 +1,28 @@
+import pytest
+
+from prosto.bench import *
+
+def test_benchmarks():
+    report = run_benchmarks(rows=[200], repeat=2, groups=10)
+
+    results = report["results"]
+    assert len(results) == len(operations) * len(modes)
+    assert all(x["time"] >= 0.0 and len(x["times"]) == 2 for x in results)
+
+    results = {(x["operation"], x["mode"]): x for x in results}
+    assert results[("calculate", "full")]["udf_calls"] == 200
+    assert results[("calculate", "incremental")]["rows_written"] == 2  # Only the batch of added rows is evaluated
+    assert results[("product", "full")]["rows_written"] == 200
+    assert results[("aggregate", "full")]["rows_written"] == 10
+
+    # Report can be serialized
+    json.dumps(report)
+
+def test_main(tmp_path):
+    output = tmp_path / "bench.json"
+    main(["-r", "1e2", "-p", "link", "roll", "-m", "full", "-n", "1", "-o", str(output)])
+
+    with open(output) as f:
+        report = json.load(f)
+    assert [x["operation"] for x in report["results"]] == ["link", "roll"]
+    assert report["results"][0]["rows"] == 100
@@ -125,3 +125,116 @@ def test_aggregate_with_path():
     assert a_clm_data[2] == 0.0
 
     pass
+
+def test_aggregate_accumulator():
+    """Aggregation with built-in accumulators specified by name."""
+    sch = Prosto("My Prosto")
+
+    # Facts
+    f_tbl = sch.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b', 'b'], 'M': [1.0, 3.0, 3.0, 4.0, 5.0]})", tables=[]
+    )
+
+    # Groups
+    g_tbl = sch.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    # Link
+    l_clm = sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    sch.aggregate(
+        name="Count", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="count", columns=[], model=None
+    )
+    sch.aggregate(
+        name="Var", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="var", columns=["M"], model={"ddof": 0}
+    )
+
+    sch.run()
+
+    assert g_tbl.get_column_series('Count').tolist() == [2.0, 3.0, 0.0]
+    assert np.allclose(g_tbl.get_column_series('Var').tolist(), [1.0, 2.0 / 3.0, 0.0])
+
+def test_aggregate_native():
+    """Aggregation with built-in (vectorized) functions specified by name."""
+    sch = Prosto("My Prosto")
+
+    # Facts
+    f_tbl = sch.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b', 'b'], 'M': [1.0, 3.0, 3.0, 4.0, 8.0]})", tables=[]
+    )
+
+    # Groups
+    g_tbl = sch.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    # Link
+    l_clm = sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    sch.aggregate(
+        name="Median", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="median", columns=["M"], model=None
+    )
+
+    sch.run()
+
+    assert g_tbl.get_column_series('Median').tolist() == [2.0, 4.0, 0.0]
+
+
+def test_aggregate_derived_columns():
+    """Aggregations using the same link see the columns calculated after the previous aggregation."""
+    sch = Prosto("My Prosto")
+
+    f_tbl = sch.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b'], 'M': [1.0, 2.0, 3.0, 4.0]})", tables=[]
+    )
+    g_tbl = sch.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b']})", tables=[]
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    sch.calculate(
+        name="C", table=f_tbl.id,
+        func="lambda x: x * 2.0", columns=["M"], model=None
+    )
+    sch.aggregate(
+        name="A1", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.sum()", columns=["M"], model=None
+    )
+    sch.calculate(
+        name="C2", table=f_tbl.id,
+        func="lambda x: x + 1.0", columns=["C"], model=None
+    )
+    sch.aggregate(
+        name="A2", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.sum()", columns=["C2"], model=None
+    )
+
+    sch.run()
+
+    g_df = g_tbl.get_df()
+    assert g_df["A1"].tolist() == [3.0, 7.0]
+    assert g_df["A2"].tolist() == [8.0, 16.0]
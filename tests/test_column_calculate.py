@@ -109,3 +109,40 @@ def test_calculate_with_path():
     assert clm_data[3] == 6.0
 
     pass
+
+def test_calculate_vectorize():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.populate(
+        table_name="My table", attributes=["A", "B"],
+        func="lambda **m: pd.DataFrame({'A': [1.0, 2.0, 3.0], 'B': [3.0, 2.0, 1.0]})", tables=[]
+    )
+
+    # Called once with arrays
+    sch.calculate(
+        name="Sum", table=tbl.id,
+        func="lambda a, b, k: (a + b) * k", columns=["A", "B"], model={"k": 2.0}, vectorize=True
+    )
+    # Fails with arrays and falls back to rows
+    sch.calculate(
+        name="Max", table=tbl.id,
+        func="lambda a, b: a if a > b else b", columns=["A", "B"], model=None, vectorize=True
+    )
+    # Returns one value for arrays and falls back to rows
+    sch.calculate(
+        name="Float", table=tbl.id,
+        func="lambda a: float(a)", columns=["A"], model=None, vectorize=True
+    )
+    # Universal function
+    sch.calculate(
+        name="Diff", table=tbl.id,
+        func="lambda a, b: abs(a - b)", columns=["A", "B"], model=None, vectorize="frompyfunc"
+    )
+
+    sch.run()
+
+    df = tbl.get_df()
+    assert df["Sum"].tolist() == [8.0, 8.0, 8.0]
+    assert df["Max"].tolist() == [3.0, 2.0, 3.0]
+    assert df["Float"].tolist() == [1.0, 2.0, 3.0]
+    assert df["Diff"].tolist() == [2.0, 0.0, 2.0]
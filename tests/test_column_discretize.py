@@ -41,3 +41,25 @@ def test_integers2():
 
     clm_data = tbl.get_column_series('My column')
     assert list(clm_data) == [-1, -1, 0, 0, 0, 1, 1, 1, 2]
+
+def test_timestamps():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.populate(
+        table_name="My table", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': pd.to_datetime(['2020-01-01 00:00', '2020-01-01 00:04', '2020-01-01 00:05', '2020-01-01 00:11'])})", tables=[]
+    )
+
+    clm = sch.discretize(
+        name="My column", table=tbl.id,
+        columns=["A"], model={"origin": pd.Timestamp("2020-01-01"), "step": pd.Timedelta("5min")}
+    )
+    clm2 = sch.discretize(
+        name="My column 2", table=tbl.id,
+        columns=["A"], model={"origin": pd.Timestamp("2020-01-01"), "step": pd.Timedelta("5min"), "closed": "right"}
+    )
+
+    sch.run()
+
+    assert list(tbl.get_column_series('My column')) == [0, 0, 1, 2]
+    assert list(tbl.get_column_series('My column 2')) == [-1, 0, 0, 2]
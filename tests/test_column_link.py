@@ -105,3 +105,84 @@ def test_two_keys():
     assert l_data[1] == 1
     assert l_data[2] == 1
     assert pd.isna(l_data[3])
+
+def test_key_index():
+    sch = Prosto("My Prosto")
+
+    # Facts
+    f_tbl = sch.populate(
+        table_name="Facts", attributes=["A", "B"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'c'], 'B': [1, 1, 2, 3]})", tables=[]
+    )
+
+    # Groups with a declared key which is indexed
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A", "B"], keys=["A", "B"]
+    )
+    g_tbl.data.add({"A": "a", "B": 1})
+    g_tbl.data.add(pd.DataFrame({"A": ["b", "b"], "B": [2, 2]}))
+
+    assert g_tbl.data.has_key_index(["A", "B"])
+    assert g_tbl.data.get_key_index(["A", "B"]) == {("a", 1): 0, ("b", 2): 1}
+
+    # Link
+    l_clm = sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A", "B"], linked_columns=["A", "B"]
+    )
+
+    sch.run()
+
+    l_data = f_tbl.get_column_series("Link")
+    assert l_data[0] == 0
+    assert l_data[1] == 0
+    assert l_data[2] == 1
+    assert pd.isna(l_data[3])
+
+    # The index is extended when rows are added
+    g_tbl.data.add({"A": "c", "B": 3})
+    assert g_tbl.data.get_key_index(["A", "B"])[("c", 3)] == 3
+
+    sch.run()
+
+    l_data = f_tbl.get_column_series("Link")
+    assert l_data.tolist() == [0, 0, 1, 3]
+
+@pytest.mark.parametrize("keys", [None, ["A"]])
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_key_index_removed(keys, storage):
+    sch = Prosto("My Prosto")
+
+    f_tbl = sch.populate(
+        table_name="Facts", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b']})", tables=[]
+    )
+
+    # Groups with duplicate keys
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A"], keys=keys, storage=storage,
+    )
+    g_tbl.data.add(pd.DataFrame({"A": ["a", "b", "a"]}))
+
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    sch.run()
+    assert f_tbl.get_column_series("Link").tolist() == [0, 1]
+
+    # The key of the removed row is linked to the next row with the same key (with or without index)
+    g_tbl.data.remove(1)
+    sch.run()
+    assert f_tbl.get_column_series("Link").tolist() == [2, 1]
+    if keys:
+        assert g_tbl.data.get_key_index(keys) == {("a",): 2, ("b",): 1}
+
+    # Removed rows are physically deleted
+    g_tbl.data.remove(1)
+    sch.run()
+    sch.run()
+    l_data = f_tbl.get_column_series("Link")
+    assert l_data[0] == 2
+    assert pd.isna(l_data[1])
@@ -114,3 +114,157 @@ def test_groll_multiple():
     assert pd.isna(clm_data[1])
     assert np.isclose(clm_data[2], 10.0)
     assert np.isclose(clm_data[3], 10.0)
+
+def test_roll_native():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.populate(
+        table_name="My table", attributes=["G", "A"],
+        func="lambda **m: pd.DataFrame({'G': [1, 2, 1, 2, 1], 'A': [1.0, 2.0, 3.0, 4.0, 5.0]})", tables=[]
+    )
+
+    # Built-in functions are specified by name
+    sch.roll(
+        name="Mean", table=tbl.id,
+        window="2", link=None,
+        func="mean", columns=["A"], model=None
+    )
+    sch.roll(
+        name="Sum", table=tbl.id,
+        window="2", link="G",
+        func="sum", columns=["A"], model=None
+    )
+
+    sch.run()
+
+    clm_data = tbl.get_column_series('Mean')
+    assert pd.isna(clm_data[0])
+    assert np.allclose(clm_data[1:].tolist(), [1.5, 2.5, 3.5, 4.5])
+
+    clm_data = tbl.get_column_series('Sum')
+    assert pd.isna(clm_data[0])
+    assert pd.isna(clm_data[1])
+    assert np.allclose(clm_data[2:].tolist(), [4.0, 6.0, 8.0])
+
+@pytest.mark.parametrize("strided", [False, True])
+def test_roll_windows(strided, monkeypatch):
+    if strided:  # Windows are created with as_strided like with numpy<1.20
+        monkeypatch.delattr(np.lib.stride_tricks, "sliding_window_view", raising=False)
+
+    sch = Prosto("My Prosto")
+
+    tbl = sch.populate(
+        table_name="My table", attributes=["G", "A", "B"],
+        func="lambda **m: pd.DataFrame({'G': [1, 2, 1, 2, 1], 'A': [1.0, 2.0, 3.0, 4.0, 5.0], 'B': [1.0, 1.0, 2.0, 2.0, 3.0]})", tables=[]
+    )
+
+    # Windows as arrays (rows x columns)
+    sch.roll(
+        name="Roll", table=tbl.id,
+        window="2", link="G",
+        func="lambda x: (x[:, 0] * x[:, 1]).sum()", columns=["A", "B"], model=None, data_type="ndarray"
+    )
+
+    # All windows in one call (windows x rows x columns)
+    sch.roll(
+        name="Batch roll", table=tbl.id,
+        window="2", link=None,
+        func="lambda x, k: (x[:, :, 0] * x[:, :, 1]).sum(axis=1) * k", columns=["A", "B"], model={"k": 2.0}, batch=True
+    )
+
+    sch.run()
+
+    clm_data = tbl.get_column_series('Roll')
+    assert pd.isna(clm_data[0]) and pd.isna(clm_data[1])
+    assert clm_data.tolist()[2:] == [7.0, 10.0, 21.0]
+
+    clm_data = tbl.get_column_series('Batch roll')
+    assert pd.isna(clm_data[0])
+    assert clm_data.tolist()[1:] == [6.0, 16.0, 28.0, 46.0]
+
+def test_roll_time():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.populate(
+        table_name="My table", attributes=["G", "T", "A"],
+        func="lambda **m: pd.DataFrame({'G': [1, 2, 1, 1, 2], 'T': pd.to_datetime(['2020-01-01 00:00', '2020-01-01 00:01', '2020-01-01 00:03', '2020-01-01 00:05', '2020-01-01 00:09']), 'A': [1.0, 2.0, 3.0, 4.0, 5.0]})", tables=[]
+    )
+
+    # Window (t - 5min, t]
+    sch.roll(
+        name="Sum", table=tbl.id,
+        window="5min", link=None, time="T",
+        func="sum", columns=["A"], model=None
+    )
+    sch.roll(
+        name="Group sum", table=tbl.id,
+        window="5min", link="G", time="T",
+        func="lambda x: x.sum()", columns=["A"], model=None
+    )
+    sch.roll(
+        name="Group count", table=tbl.id,
+        window="5min", link="G", time="T",
+        func="lambda x: len(x)", columns=["A", "T"], model=None, data_type="ndarray"
+    )
+
+    sch.run()
+
+    df = tbl.get_df()
+    assert df["Sum"].tolist() == [1.0, 3.0, 6.0, 9.0, 9.0]
+    assert df["Group sum"].tolist() == [1.0, 2.0, 4.0, 7.0, 5.0]
+    assert df["Group count"].tolist() == [1, 1, 2, 2, 1]
+
+@pytest.mark.parametrize("func", ["sum", "mean", "count", "min", "max", "std", "median"])
+def test_roll_time_native(func):
+    """Built-in functions over windows with numeric timestamps (unsorted, with equal timestamps and missing values)."""
+    sch = Prosto("My Prosto")
+
+    df = pd.DataFrame({"G": [1, 2, 1, 1, 2, 1, 1], "T": [0.0, 1.0, 2.5, 1.0, 4.0, 5.0, 5.0], "A": [1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0]})
+    tbl = sch.populate(
+        table_name="My table", attributes=["G", "T", "A"],
+        func=lambda **m: df, tables=[]
+    )
+
+    # Window (t - 3, t]
+    sch.roll(
+        name="Group roll", table=tbl.id,
+        window="3", link="G", time="T",
+        func=func, columns=["A"], model=None
+    )
+
+    sch.run()
+
+    # Rows of a window are the previous rows (in the order of time) of the same group
+    expected = []
+    for i, row in df.iterrows():
+        group = df[df["G"] == row["G"]].sort_values("T", kind="stable")
+        window = group.iloc[:list(group.index).index(i) + 1]
+        window = window[window["T"] > row["T"] - 3.0]
+        expected.append(getattr(window["A"], func)())
+
+    assert np.allclose(tbl.get_column_series("Group roll").astype(float), expected, equal_nan=True)
+
+def test_roll_time_incremental():
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["G", "T", "A"],
+    )
+
+    # Numeric timestamps with numeric duration
+    sch.roll(
+        name="Group sum", table=tbl.id,
+        window="5", link="G", time="T",
+        func="lambda x: x.sum()", columns=["A"], model=None
+    )
+
+    sch.run()
+
+    tbl.data.add(pd.DataFrame({"G": [1, 2, 1], "T": [0, 1, 3], "A": [1.0, 2.0, 3.0]}))
+    sch.run()
+
+    tbl.data.add(pd.DataFrame({"G": [1, 2], "T": [5, 9], "A": [4.0, 5.0]}))
+    sch.run()
+
+    assert tbl.get_column_series("Group sum").tolist() == [1.0, 2.0, 4.0, 7.0, 5.0]
@@ -66,3 +66,319 @@ def test_calculate_value():
     assert tbl.data.added_range.end == 3
     assert tbl.data.removed_range.start == 3
     assert tbl.data.removed_range.end == 3
+
+def test_link():
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    # Facts
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "B"],
+    )
+
+    # Groups
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A", "B"],
+    )
+
+    l_clm = sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A", "B"], linked_columns=["A", "B"]
+    )
+
+    sch.run()  # Inference on empty data
+
+    g_tbl.data.add({"A": "a", "B": 1})
+    g_tbl.data.add({"A": "b", "B": 2})
+
+    f_tbl.data.add({"A": "a", "B": 1})
+    f_tbl.data.add({"A": "b", "B": 2})
+    f_tbl.data.add({"A": "c", "B": 3})
+
+    sch.run()
+
+    f_df = f_tbl.get_df()
+    assert f_df["Link"][0] == 0
+    assert f_df["Link"][1] == 1
+    assert pd.isna(f_df["Link"][2])
+
+    # The index of the linked table is extended with new rows
+    g_tbl.data.add({"A": "c", "B": 3})
+    f_tbl.data.add({"A": "c", "B": 3})
+    f_tbl.data.add({"A": "a", "B": 1})
+
+    sch.run()
+
+    f_df = f_tbl.get_df()
+    assert pd.isna(f_df["Link"][2])  # Old rows are not re-evaluated
+    assert f_df["Link"][3] == 2
+    assert f_df["Link"][4] == 0
+
+    # Removed rows of the linked table are not referenced
+    g_tbl.data.remove(1)
+    f_tbl.data.add({"A": "a", "B": 1})
+
+    sch.run()
+
+    f_df = f_tbl.get_df()
+    assert pd.isna(f_df["Link"][5])
+
+@pytest.mark.parametrize("executor", ["serial", "process"])
+def test_aggregate(executor):
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    # Facts
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "M"],
+    )
+
+    # Groups
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A"], keys=["A"]
+    )
+
+    l_clm = sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    sch.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="sum", columns=["M"], model=None
+    )
+    sch.aggregate(
+        name="Mean", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="mean", columns=["M"], model=None
+    )
+    sch.aggregate(
+        name="Max", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="max", columns=["M"], model=None
+    )
+
+    g_tbl.data.add(pd.DataFrame({"A": ["a", "b"]}))
+    f_tbl.data.add(pd.DataFrame({"A": ["a", "a", "b"], "M": [1.0, 2.0, 3.0]}))
+
+    sch.run(executor=executor)
+
+    g_df = g_tbl.get_df()
+    assert g_df["Sum"].tolist() == [3.0, 3.0]
+    assert g_df["Mean"].tolist() == [1.5, 3.0]
+    assert g_df["Max"].tolist() == [2.0, 3.0]
+
+    # Only new rows are added to the state
+    f_tbl.data.add(pd.DataFrame({"A": ["b", "a"], "M": [5.0, 6.0]}))
+
+    sch.run(executor=executor)
+
+    # The state evaluated in a worker process is returned and kept for the next run
+    metrics = [x for x in sch.metrics if x["outputs"] == ["Sum"]][0]
+    assert metrics["rows_read"] == 2
+
+    g_df = g_tbl.get_df()
+    assert g_df["Sum"].tolist() == [9.0, 8.0]
+    assert g_df["Mean"].tolist() == [3.0, 4.0]
+    assert g_df["Max"].tolist() == [6.0, 5.0]
+
+    # Removed rows are retracted from the state (or the state is re-computed)
+    f_tbl.data.remove(2)
+
+    sch.run(executor=executor)
+
+    g_df = g_tbl.get_df()
+    assert g_df["Sum"].tolist() == [6.0, 8.0]
+    assert g_df["Mean"].tolist() == [6.0, 4.0]
+    assert g_df["Max"].tolist() == [6.0, 5.0]
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_append(storage):
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"], storage=storage, commit_size=5,
+    )
+
+    clm = sch.calculate(
+        name="My column", table=tbl.id,
+        func="lambda x: x * 2.0", columns=["A"], model=None
+    )
+
+    sch.run()
+
+    # Records in different formats are buffered and not visible before commit
+    tbl.append({"A": 1.0})
+    tbl.append([{"A": 2.0}, {"A": 3.0}])
+    assert tbl.data.added_length() == 0
+    assert tbl.data.buffer_length == 3
+
+    # Buffer is committed before evaluation
+    sch.run()
+    assert tbl.data.buffer_length == 0
+    assert tbl.get_column_series("My column").tolist() == [2.0, 4.0, 6.0]
+
+    # Buffer is committed when it reaches the commit size
+    tbl.append(pd.DataFrame({"A": [4.0, 5.0, 6.0]}))
+    assert tbl.data.added_length() == 0
+    tbl.append({"A": [7.0, 8.0]})
+    assert tbl.data.added_length() == 5
+    assert tbl.data.buffer_length == 0
+
+    tbl.append({"A": 9.0})
+    assert tbl.commit() == 1
+
+    sch.run()
+    assert tbl.get_column_series("My column").tolist() == [2.0, 4.0, 6.0, 8.0, 10.0, 12.0, 14.0, 16.0, 18.0]
+
+def test_roll():
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["G", "A"],
+    )
+
+    sch.roll(
+        name="Sum", table=tbl.id,
+        window="3", link=None,
+        func="sum", columns=["A"], model={}
+    )
+    sch.roll(
+        name="Group sum", table=tbl.id,
+        window="2", link="G",
+        func="sum", columns=["A"], model={}
+    )
+    sch.roll(
+        name="Group max", table=tbl.id,
+        window="2", link="G",
+        func="lambda x: x.max()", columns=["A"], model={}
+    )
+
+    sch.run()
+
+    tbl.data.add(pd.DataFrame({"G": [1, 2, 1], "A": [1.0, 2.0, 3.0]}))
+    sch.run()
+
+    tbl.data.add(pd.DataFrame({"G": [2, 1, 2], "A": [4.0, 5.0, 6.0]}))
+    sch.run()
+
+    tbl.data.add({"G": 1, "A": 7.0})
+    sch.run()
+
+    df = tbl.get_df()
+    assert df["Sum"].tolist()[2:] == [6.0, 9.0, 12.0, 15.0, 18.0]
+    assert df["Group sum"].tolist()[2:] == [4.0, 6.0, 8.0, 10.0, 12.0]
+    assert df["Group max"].tolist()[2:] == [3.0, 4.0, 5.0, 6.0, 7.0]
+
+    # The oldest rows are removed but are still used as history before gc
+    tbl.data.remove(2)
+    tbl.data.add({"G": 2, "A": 8.0})
+    sch.run()
+
+    df = tbl.get_df()
+    assert df["Sum"].tolist()[-1] == 21.0
+    assert df["Group sum"].tolist()[-1] == 14.0
+
+def create_roll_workflow(incremental, storage, time, rows=None):
+    sch = Prosto("My Prosto")
+    sch.incremental = incremental
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["G", "T", "A"], storage=storage,
+    )
+    sch.roll(
+        name="Group sum", table=tbl.id,
+        window="3", link="G", time=time,
+        func="sum" if time is None else "lambda x: x.sum()", columns=["A"], model={} if time is None else None
+    )
+
+    if rows is not None:
+        tbl.data.add(rows)
+        sch.run()
+    return sch, tbl
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+@pytest.mark.parametrize("time", [None, "T"])
+def test_roll_history(storage, time, monkeypatch):
+    sch, tbl = create_roll_workflow(True, storage, time)
+    sch.run()
+
+    # Read slices of the table are recorded to check that old rows are not read
+    slices = []
+    get_slice = type(tbl.data).get_slice
+    monkeypatch.setattr(type(tbl.data), "get_slice", lambda self, start, end, columns: slices.append(start) or get_slice(self, start, end, columns))
+
+    rng = np.random.default_rng(0)
+    batches = []
+    for i in range(6):
+        batches.append(pd.DataFrame({"G": rng.integers(0, 3, 5), "T": np.arange(5 * i, 5 * i + 5), "A": rng.random(5)}))
+
+        start = tbl.data.id_range().end
+        tbl.data.add(batches[-1])
+        slices.clear()
+        sch.run()
+        if i > 0:  # Trailing rows of the groups are stored in the state of the operation
+            assert min(slices) >= start
+
+        # Incrementally evaluated values are equal to the values evaluated for all rows
+        full_sch, full_tbl = create_roll_workflow(False, storage, time, pd.concat(batches, ignore_index=True))
+        assert np.allclose(tbl.get_column_series("Group sum").astype(float), full_tbl.get_column_series("Group sum").astype(float), equal_nan=True)
+
+    # Old rows are read again if an added row is older than the stored rows (of time windows) or the state is not valid
+    op = sch.get_column_operations(tbl.id, "Group sum")[0]
+    for batch in [pd.DataFrame({"G": [0, 1], "T": [0, 1], "A": [1.0, 2.0]}), pd.DataFrame({"G": [0], "T": [30], "A": [3.0]})]:
+        batches.append(batch)
+        start = tbl.data.id_range().end
+        tbl.data.add(batch)
+        op.state = None if len(batch) == 1 else op.state
+        sch.run()
+
+        # Values of old rows are not changed by the added rows (even if they are within their windows)
+        full_sch, full_tbl = create_roll_workflow(False, storage, time, pd.concat(batches, ignore_index=True))
+        assert np.allclose(tbl.get_column_series("Group sum")[start:].astype(float), full_tbl.get_column_series("Group sum")[start:].astype(float), equal_nan=True)
+
+def test_link_project_removed():
+    """Links are evaluated again for all rows if the linked table has been rebuilt (with new ids) by a table operation."""
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "M"],
+    )
+    g_tbl = sch.project(
+        table_name="Groups", attributes=["X"],
+        link="Link", tables=["Facts"]
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["X"]
+    )
+    sch.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="sum", columns=["M"], model=None
+    )
+    sch.roll(
+        name="Roll", table=f_tbl.id,
+        window="2", link="Link",
+        func="sum", columns=["M"], model={}
+    )
+
+    f_tbl.data.add(pd.DataFrame({"A": ["x", "y", "x", "y"], "M": [1.0, 2.0, 3.0, 4.0]}))
+    sch.run()
+    assert g_tbl.get_df()["X"].tolist() == ["x", "y"]
+    assert g_tbl.get_df()["Sum"].tolist() == [4.0, 6.0]
+
+    # The first fact is removed so the project table gets new ids (y:0, x:1, z:2)
+    f_tbl.data.remove(1)
+    f_tbl.data.add(pd.DataFrame({"A": ["z", "x"], "M": [5.0, 6.0]}))
+    sch.run()
+
+    g_df = g_tbl.get_df()
+    f_df = f_tbl.get_df()
+    assert g_df["X"].tolist() == ["y", "x", "z"]
+    assert f_df["Link"].tolist() == [0, 1, 0, 2, 1]
+    assert f_df["Roll"].tolist()[-1] == 9.0  # Window of the new x row is found by the new group id
+    assert g_df["Sum"].tolist() == [6.0, 9.0, 5.0]
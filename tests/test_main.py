@@ -0,0 +1,111 @@
+import pytest
+
+from prosto.main import *
+
+def write_workflow(path):
+    with open(path / "udfs_main.py", "w") as f:
+        f.write("def double(x):\n    return x * 2.0\n")
+
+    with open(path / "facts.csv", "w") as f:
+        f.write("A,M\na,1.0\nb,2.0\n")
+
+    definition = {
+        "id": "My Prosto",
+        "imports": ["udfs_main"],
+        "tables": [
+            {"table_name": "Facts", "attributes": ["A", "M"], "source": "facts.csv"},
+            {"table_name": "Groups", "attributes": ["A"], "keys": ["A"]},
+        ],
+        "operations": [
+            {"operation": "calculate", "name": "M2", "table": "Facts", "func": "udfs_main:double", "columns": ["M"]},
+            {"operation": "link", "name": "Link", "table": "Facts", "type": "Groups", "columns": ["A"], "linked_columns": ["A"]},
+        ],
+    }
+    with open(path / "workflow.json", "w") as f:
+        json.dump(definition, f)
+
+    return str(path / "workflow.json")
+
+def test_run(tmp_path, capsys):
+    file = write_workflow(tmp_path)
+
+    assert main(["-l", "WARNING", file]) == 0
+
+    out = capsys.readouterr().out
+    assert "Run 1 of workflow 'My Prosto'" in out
+    assert "calculate" in out and "M2" in out
+
+def test_watch(tmp_path, capsys):
+    file = write_workflow(tmp_path)
+
+    sch, sources = create_workflow(load_definition(file), str(tmp_path))
+    sch.incremental = True
+    assert sources[0].read() == 2
+    sch.run()
+
+    # Incomplete lines are read only when they are finished
+    with open(tmp_path / "facts.csv", "a") as f:
+        f.write("a,3.0\nb,4")
+    assert sources[0].read() == 1
+    with open(tmp_path / "facts.csv", "a") as f:
+        f.write(".0\n")
+
+    assert watch(sch, sources, interval=0.0, count=1) == 1
+
+    f_df = sch.get_table("Facts").get_df()
+    assert f_df["M2"].tolist() == [2.0, 4.0, 6.0, 8.0]
+    assert sch.get_metrics()["rows_written"].tolist() == [2, 2]  # Only the new rows are evaluated
+
+def test_source_types(tmp_path):
+    with open(tmp_path / "facts.csv", "w") as f:
+        f.write("A,N,M\na,1,1.0\n")
+
+    sch = Prosto("My Prosto")
+    tbl = sch.create_table(table_name="Facts", attributes=["A", "N", "M"])
+    source = SourceFile(tbl, str(tmp_path / "facts.csv"))
+    assert source.read() == 1
+
+    # Rows are appended to the buffer and added by the next run
+    assert tbl.data.buffer_length == 1 and len(tbl.get_df()) == 0
+
+    # Later rows are parsed with the types of the first rows (or wider types if necessary)
+    with open(tmp_path / "facts.csv", "a") as f:
+        f.write("1,2,2\n")
+    assert source.read() == 1
+    with open(tmp_path / "facts.csv", "a") as f:
+        f.write("2,,3\n")
+    assert source.read() == 1
+    sch.run()
+
+    df = tbl.get_df()
+    assert df["A"].tolist() == ["a", "1", "2"]
+    assert df["N"].tolist()[:2] == [1.0, 2.0] and pd.isna(df["N"][2])
+    assert df["M"].dtype == np.float64 and df["M"].tolist() == [1.0, 2.0, 3.0]
+
+def test_source_text(tmp_path):
+    with open(tmp_path / "facts.csv", "w") as f:
+        f.write("A,N,M\na,1,1.0\n")
+
+    sch = Prosto("My Prosto")
+    tbl = sch.create_table(table_name="Facts", attributes=["A", "N", "M"])
+    source = SourceFile(tbl, str(tmp_path / "facts.csv"))
+    assert source.read() == 1
+
+    # Text in numeric columns is read as objects and the types of other columns are retained
+    with open(tmp_path / "facts.csv", "a") as f:
+        f.write("b,x,2.0\nc,3,y\n")
+    assert source.read() == 2
+    assert source.dtypes["N"] == np.dtype(object) and source.dtypes["M"] == np.dtype(object)
+    with open(tmp_path / "facts.csv", "a") as f:
+        f.write("d,4,4.0\n")
+    assert source.read() == 1
+    sch.run()
+
+    df = tbl.get_df()
+    assert df["A"].tolist() == ["a", "b", "c", "d"]
+    assert df["N"].tolist() == [1, "x", "3", "4"]
+    assert df["M"].tolist() == [1.0, "2.0", "y", "4.0"]
+
+def test_unknown_operation(tmp_path):
+    with pytest.raises(ValueError):
+        create_workflow({"operations": [{"operation": "unknown"}]}, str(tmp_path))
@@ -0,0 +1,49 @@
+import pytest
+
+from prosto.Prosto import *
+
+def test_function_cache():
+    clear_cache()
+
+    func = resolve_full_name("lambda x: x + 1")
+    assert func(1) == 2
+    assert resolve_full_name("lambda x: x + 1") is func  # Compiled once
+
+    assert resolve_full_name("numpy:sum") is np.sum
+    assert "numpy:sum" in function_cache
+
+    # Names which cannot be resolved are not cached
+    assert resolve_full_name("unknown_module_xyz:func") is None
+    assert "unknown_module_xyz:func" not in function_cache
+
+    assert import_modules(["json"])[0] is module_cache["json"]
+
+    clear_cache()
+    assert not function_cache and not module_cache
+    assert resolve_full_name("lambda x: x + 1") is not func
+
+def test_translate():
+    clear_cache()
+
+    sch = Prosto("My Prosto")
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"],
+    )
+    sch.calculate(
+        name="My column", table=tbl.id,
+        func="lambda x: x * 3.0", columns=["A"], model=None
+    )
+    sch.roll(
+        name="Roll", table=tbl.id,
+        window="2", link=None,
+        func="sum", columns=["A"], model=None
+    )
+
+    # Functions are resolved during translation and evaluation uses them from the cache
+    sch.translate()
+    assert list(function_cache.keys()) == ["lambda x: x * 3.0"]
+
+    tbl.data.add({"A": 1.0})
+    sch.run()
+    assert len(function_cache) == 1
+    assert tbl.get_column_series("My column").tolist() == [3.0]
@@ -0,0 +1,369 @@
+import pytest
+import pickle
+import threading
+
+from prosto.Prosto import *
+from prosto.Prosto import _evaluate_operation_output
+
+def create_workflow():
+    sch = Prosto("My Prosto")
+
+    # Facts
+    f_tbl = sch.populate(
+        table_name="Facts", attributes=["A", "M"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'a', 'b', 'b'], 'M': [1.0, 2.0, 3.0, 4.0]})", tables=[]
+    )
+
+    # Groups
+    g_tbl = sch.populate(
+        table_name="Groups", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': ['a', 'b', 'c']})", tables=[]
+    )
+
+    # Several independent columns in one layer
+    sch.calculate(
+        name="M2", table=f_tbl.id,
+        func="lambda x: x * 2.0", columns=["M"], model=None
+    )
+    sch.calculate(
+        name="M3", table=f_tbl.id,
+        func="lambda x: x * 3.0", columns=["M"], model=None
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+
+    sch.aggregate(
+        name="Aggregate", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.sum()", columns=["M2"], model=None
+    )
+
+    return sch
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_executor(executor):
+    sch = create_workflow()
+
+    sch.run(executor=executor, max_workers=2)
+
+    f_df = sch.get_table("Facts").get_df()
+    assert f_df["M2"].tolist() == [2.0, 4.0, 6.0, 8.0]
+    assert f_df["M3"].tolist() == [3.0, 6.0, 9.0, 12.0]
+    assert f_df["Link"].tolist() == [0, 0, 1, 1]
+
+    g_df = sch.get_table("Groups").get_df()
+    assert g_df["Aggregate"].tolist() == [6.0, 14.0, 0.0]
+
+    with pytest.raises(ValueError):
+        sch.run(executor="unknown")
+
+def test_thread_caches(monkeypatch):
+    """Key indexes and groups shared by operations of one layer are built before the layer is evaluated in threads."""
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "B", "M"],
+    )
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A"], keys=["A"],
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+    sch.link(
+        name="Link2", table=f_tbl.id, type=g_tbl.id,
+        columns=["B"], linked_columns=["A"]
+    )
+    sch.aggregate(
+        name="Aggregate", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.sum()", columns=["M"], model=None
+    )
+    sch.aggregate(
+        name="Aggregate2", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.max()", columns=["M"], model=None
+    )
+
+    # Caches are changed only in the main thread and the evaluation in workers finds them already built
+    changes = []
+    get_range_values = Data._get_range_values
+    get_or_create_groupby = Table._get_or_create_groupby
+
+    def recorded_get_range_values(self, *args):
+        changes.append(threading.current_thread())  # Key index is extended
+        return get_range_values(self, *args)
+
+    def recorded_get_or_create_groupby(self, link_column_name):
+        if link_column_name not in self.groupby:
+            changes.append(threading.current_thread())
+        return get_or_create_groupby(self, link_column_name)
+
+    monkeypatch.setattr(Data, "_get_range_values", recorded_get_range_values)
+    monkeypatch.setattr(Table, "_get_or_create_groupby", recorded_get_or_create_groupby)
+
+    for i in range(2):
+        g_tbl.data.add(pd.DataFrame({"A": ["a{}".format(i), "b{}".format(i)]}))
+        f_tbl.data.add(pd.DataFrame({"A": ["a{}".format(i), "b{}".format(i)], "B": ["b{}".format(i), "a{}".format(i)], "M": [1.0, 2.0]}))
+        sch.run(executor="thread", max_workers=2)
+
+    monkeypatch.undo()
+
+    assert changes
+    assert all(x is threading.main_thread() for x in changes)
+
+    f_df = f_tbl.get_df()
+    assert f_df["Link"].tolist() == [0, 1, 2, 3]
+    assert f_df["Link2"].tolist() == [1, 0, 3, 2]
+
+    g_df = g_tbl.get_df()
+    assert g_df["Aggregate"].tolist() == [1.0, 2.0, 1.0, 2.0]
+    assert g_df["Aggregate2"].tolist() == [1.0, 2.0, 1.0, 2.0]
+
+def test_cached_topology():
+    sch = create_workflow()
+
+    sch.run()
+    topology = sch.topology
+    data = sch.get_table("Facts").data
+
+    # Repeated runs reuse the topology and data objects
+    sch.run()
+    assert sch.topology is topology
+    assert sch.get_table("Facts").data is data
+
+    f_df = sch.get_table("Facts").get_df()
+    assert f_df["M2"].tolist() == [2.0, 4.0, 6.0, 8.0]
+    g_df = sch.get_table("Groups").get_df()
+    assert g_df["Aggregate"].tolist() == [6.0, 14.0, 0.0]
+
+    # Schema change invalidates the topology
+    sch.calculate(
+        name="M4", table="Facts",
+        func="lambda x: x * 4.0", columns=["M"], model=None
+    )
+    assert sch.topology is None
+
+    sch.run()
+    assert sch.topology is not topology
+
+    f_df = sch.get_table("Facts").get_df()
+    assert f_df["M4"].tolist() == [4.0, 8.0, 12.0, 16.0]
+
+@pytest.mark.parametrize("executor", ["serial", "process"])
+def test_metrics(executor):
+    sch = create_workflow()
+
+    exported = []
+    sch.metrics_hook = exported.append
+
+    sch.run(executor=executor, max_workers=2)
+
+    report = sch.get_metrics()
+    assert len(report) == 6
+    assert report["run"].tolist() == [1] * 6
+    assert (report["wall_time"] >= 0.0).all()
+    assert exported == sch.metrics
+
+    metrics = report.set_index(report["outputs"].str[0])
+    assert metrics.loc["Facts", "rows_written"] == 4
+    assert metrics.loc["Facts", "udf_calls"] == 1
+    assert metrics.loc["M2", "rows_read"] == 4
+    assert metrics.loc["M2", "udf_calls"] == 4
+    assert metrics.loc["M2", "bytes_written"] == 32
+    assert metrics.loc["Link", "rows_written"] == 4
+    assert metrics.loc["Aggregate", "rows_read"] == 4
+    assert metrics.loc["Aggregate", "udf_calls"] == 2  # Groups without facts are not passed to the function
+
+    # Metrics are collected for each run separately
+    sch.run()
+    assert sch.get_metrics()["run"].tolist() == [2] * 6
+    assert len(exported) == 12
+
+def test_metrics_ufunc():
+    sch = Prosto("My Prosto")
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"],
+    )
+    sch.calculate(
+        name="Sqrt", table=tbl.id,
+        func="numpy:sqrt", columns=["A"], model=None
+    )
+    tbl.data.add(pd.DataFrame({"A": [1.0, 4.0, 9.0]}))
+    sch.run()
+
+    # Ufuncs are passed to pandas as is and evaluated in one call
+    assert tbl.get_column_series("Sqrt").tolist() == [1.0, 2.0, 3.0]
+    assert sch.get_metrics()["udf_calls"].tolist() == [1]
+
+class CountHook(Hook):
+
+    udf_calls = True
+
+    def __init__(self):
+        self.calls = {"run": 0, "operation": 0, "udf": 0, "write": 0}
+
+    def before_run(self, prosto):
+        self.calls["run"] += 1
+
+    def after_operation(self, op, metrics):
+        self.calls["operation"] += 1
+
+    def after_udf(self, op):
+        self.calls["udf"] += 1
+
+    def on_write(self, op, output):
+        self.calls["write"] += 1
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_hooks(executor, tmp_path):
+    sch = create_workflow()
+
+    hook = sch.add_hook(CountHook())
+    trace = sch.add_hook(TraceHook(file=tmp_path / "trace.json", udf_calls=True))
+
+    sch.run(executor=executor, max_workers=2)
+
+    assert hook.calls["run"] == 1
+    assert hook.calls["operation"] == 6
+    assert hook.calls["write"] == 6
+    if executor != "process":  # UDFs are called in worker processes
+        assert hook.calls["udf"] == 12
+
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    operations = [x for x in events if x["ph"] == "X" and x["name"] != "udf"]
+    assert sorted([x["name"] for x in operations]) == ["Aggregate", "Facts", "Groups", "Link", "M2", "M3"]
+    assert all(x["dur"] >= 0 for x in operations)
+
+    sch.remove_hook(hook)
+    sch.run()
+    assert hook.calls["run"] == 1
+
+def test_process_pickle():
+    sch = create_workflow()
+    sch.run()
+
+    # Only the data of tables the operation depends on is sent to a worker process
+    op = sch.get_column_operations("Facts", "M2")[0]
+    payload = sch._pickle_operation(op)
+    worker_op = pickle.loads(payload)
+    assert worker_op.prosto.get_table("Groups").data is None
+    assert len(worker_op.prosto.get_table("Facts").get_df()) == 4
+    assert sch.get_table("Groups").data is not None
+
+    # Evaluation in a worker is stateless: only the output and statistics are returned
+    output, stats, duration = _evaluate_operation_output(payload)
+    assert output[0].tolist() == [2.0, 4.0, 6.0, 8.0]
+    assert stats["udf_calls"] == 4 and stats["rows_read"] == 4
+
+    op = sch.get_column_operations("Groups", "Aggregate")[0]
+    worker_op = pickle.loads(sch._pickle_operation(op))
+    assert worker_op.prosto.get_table("Facts").data is not None
+    assert worker_op.prosto.get_table("Groups").data is not None
+
+def test_profile_hook():
+    sch = create_workflow()
+
+    profile = sch.add_hook(ProfileHook())
+    sch.run()
+    sch.run(chunk_size=2)
+
+    op = sch.get_column_operations("Facts", "M2")[0]
+    assert isinstance(profile.profiles[op.id], pstats.Stats)
+    assert len(profile.profiles) == 6
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_chunks(storage):
+    sch = Prosto("My Prosto")
+
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "M"], storage=storage,
+    )
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A", "N"], storage=storage,
+    )
+
+    sch.calculate(
+        name="M2", table=f_tbl.id,
+        func="lambda x: x * 2.0", columns=["M"], model=None
+    )
+    sch.compute(
+        name="M3", table=f_tbl.id,
+        func="lambda x: x * 3.0", columns=["M"], model=None, row_local=True
+    )
+    sch.discretize(
+        name="D", table=f_tbl.id,
+        columns=["M"], model={"origin": 0, "step": 2}
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+    sch.merge(
+        name="N", table=f_tbl.id,
+        columns=["Link", "N"]
+    )
+    sch.aggregate(
+        name="Aggregate", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="lambda x: x.sum()", columns=["M2"], model=None
+    )
+
+    f_tbl.data.add(pd.DataFrame({"A": ["a", "b", "c", "a", "b", "d", "c"], "M": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]}))
+    g_tbl.data.add(pd.DataFrame({"A": ["a", "b", "c"], "N": [10, 20, 30]}))
+
+    sch.run(chunk_size=3)
+
+    f_df = f_tbl.get_df()
+    assert f_df["M2"].tolist() == [2.0, 4.0, 6.0, 8.0, 10.0, 12.0, 14.0]
+    assert f_df["M3"].tolist() == [3.0, 6.0, 9.0, 12.0, 15.0, 18.0, 21.0]
+    assert f_df["D"].tolist() == [0, 1, 1, 2, 2, 3, 3]
+    assert f_df["Link"].tolist()[:5] == [0, 1, 2, 0, 1]
+    assert f_df["M2"].dtype == np.float64  # Same types as without chunks
+    assert f_df["M3"].dtype == np.float64
+    assert pd.isna(f_df["Link"][5])
+    assert f_df["N"].tolist()[:5] == [10, 20, 30, 10, 20]
+
+    g_df = g_tbl.get_df()
+    assert g_df["Aggregate"].tolist() == [10.0, 14.0, 20.0]
+
+def test_chunks_no_frame(monkeypatch):
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    tbl = sch.create_table(
+        table_name="Facts", attributes=["M"], storage="columnar",
+    )
+    sch.calculate(
+        name="M2", table=tbl.id,
+        func="lambda x: x * 2.0", columns=["M"], model=None
+    )
+    sch.calculate(
+        name="M3", table=tbl.id,
+        func="lambda x: x + 1.0", columns=["M2"], model=None
+    )
+    sch.discretize(
+        name="D", table=tbl.id,
+        columns=["M3"], model={"origin": 0.0, "step": 4.0}
+    )
+
+    # Each chunk reads a slice of arrays instead of rebuilding the frame of the whole table
+    calls = []
+    get_df = ColumnarData.get_df
+    monkeypatch.setattr(ColumnarData, "get_df", lambda self: calls.append(1) or get_df(self))
+
+    tbl.data.add(pd.DataFrame({"M": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]}))
+    sch.run(chunk_size=2)
+    tbl.data.add(pd.DataFrame({"M": [8.0, 9.0, 10.0]}))
+    sch.run(chunk_size=2)
+    assert not calls
+
+    monkeypatch.undo()
+    df = tbl.get_df()
+    assert df["M3"].tolist() == [x * 2.0 + 1.0 for x in range(1, 11)]
+    assert df["D"].tolist() == [int((x * 2.0 + 1.0) // 4.0) for x in range(1, 11)]
@@ -0,0 +1,83 @@
+import pytest
+
+from prosto.Prosto import *
+
+def test_lookup():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"],
+    )
+
+    clm = sch.calculate(
+        name="My column", table=tbl.id,
+        func="lambda x: float(x)", columns=["A"], model=None
+    )
+
+    assert sch.get_table("My table") is tbl
+    assert sch.get_column("My table", "My column") is clm
+    assert sch.get_columns("My table") == [clm]
+    assert len(sch.get_column_operations("My table", "My column")) == 1
+    assert len(sch.get_table_operations("My table")) == 0
+
+    # Replace the table and remove the column
+    tbl2 = sch.create_table(
+        table_name="My table", attributes=["A", "B"],
+    )
+    assert sch.get_table("My table") is tbl2
+    assert len(sch.tables) == 1
+
+    sch.remove_column("My table", "My column")
+    assert sch.get_column("My table", "My column") is None
+    assert sch.get_columns("My table") == []
+
+    sch.remove_table("My table")
+    assert sch.get_table("My table") is None
+
+def test_large_schema():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.populate(
+        table_name="My table", attributes=["A"],
+        func="lambda **m: pd.DataFrame({'A': [1.0, 2.0, 3.0]})", tables=[]
+    )
+
+    # A chain of columns each depending on the previous one
+    prev_name = "A"
+    for i in range(200):
+        name = "C" + str(i)
+        sch.calculate(
+            name=name, table=tbl.id,
+            func="lambda x: x + 1.0", columns=[prev_name], model=None
+        )
+        prev_name = name
+
+    topology = sch.translate()
+    assert len(topology.layers) == 201
+
+    sch.run()
+
+    assert tbl.get_column_series("C199").tolist() == [201.0, 202.0, 203.0]
+
+def test_cycle():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"],
+    )
+
+    sch.calculate(
+        name="B", table=tbl.id,
+        func="lambda x: x + 1.0", columns=["C"], model=None
+    )
+    sch.calculate(
+        name="C", table=tbl.id,
+        func="lambda x: x + 1.0", columns=["B"], model=None
+    )
+    sch.calculate(
+        name="D", table=tbl.id,
+        func="lambda x: x + 1.0", columns=["A"], model=None
+    )
+
+    with pytest.raises(ValueError, match="cyclic"):
+        sch.translate()
@@ -0,0 +1,324 @@
+import pytest
+
+from prosto.Prosto import *
+
+def test_columnar_add():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A", "B"], storage="columnar",
+    )
+    assert isinstance(tbl.data, ColumnarData)
+
+    # Add more rows than the initial capacity one by one
+    for i in range(100):
+        tbl.data.add({"A": i, "B": "x" + str(i)})
+    tbl.data.add(pd.DataFrame({"A": [100.5, 101.5], "C": [True, False]}))
+
+    assert tbl.data.capacity >= 102
+    assert tbl.data.added_range == Range(0, 102)
+
+    df = tbl.get_df()
+    assert df["A"].tolist()[98:] == [98, 99, 100.5, 101.5]
+    assert df["B"].tolist()[99] == "x99"
+    assert df["B"].isna().tolist()[-2:] == [True, True]
+    assert df["C"].isna().sum() == 100
+
+    assert tbl.data.get_added_slice(["A"])["A"].tolist()[:2] == [0.0, 1.0]
+
+def test_columnar_incremental():
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"], storage="columnar",
+    )
+
+    clm = sch.calculate(
+        name="My column", table=tbl.id,
+        func="lambda x: x * 2.0", columns=["A"], model=None
+    )
+
+    sch.incremental = True
+
+    sch.run()
+
+    tbl.data.add({"A": 1})
+    tbl.data.add({"A": 2})
+    sch.run()
+
+    tbl.data.add({"A": 3})
+    assert tbl.data.get_added_slice(["A"]).index.tolist() == [2]
+    sch.run()
+
+    assert tbl.get_column_series("My column").tolist() == [2.0, 4.0, 6.0]
+
+    # Removed rows are physically deleted and ids are retained
+    tbl.data.remove(2)
+    sch.run()
+    sch.run()
+
+    assert tbl.data.size == 1
+    assert tbl.get_df().index.tolist() == [2]
+    assert tbl.get_column_series("My column").tolist() == [6.0]
+
+def test_unknown_storage():
+    sch = Prosto("My Prosto")
+
+    with pytest.raises(ValueError):
+        sch.create_table(
+            table_name="My table", attributes=["A"], storage="unknown",
+        )
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_slices(storage):
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A", "B"], storage=storage,
+    )
+    tbl.data.add(pd.DataFrame({"A": np.arange(10.0), "B": np.arange(10.0)}))
+    tbl.data.remove(2)
+
+    # Ranges are half-open and removed rows are excluded
+    assert tbl.data.get_slice(3, 6, ["A", "B"]).index.tolist() == [3, 4, 5]
+    assert tbl.data.get_full_slice(["A"]).index.tolist() == list(range(2, 10))
+    assert tbl.data.get_added_slice(["B"]).index.tolist() == list(range(0, 10))
+
+    # Slices of one column share memory with the table data
+    assert np.shares_memory(tbl.data.get_slice(3, 6, ["A"])["A"].values, tbl.data.get_series("A").values)
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_write(storage):
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"], storage=storage,
+    )
+    tbl.data.add(pd.DataFrame({"A": [1.0, 2.0, 3.0, 4.0]}))
+
+    # Values for all rows of the range
+    tbl.data.set_column_values_for_range(pd.DataFrame({"B": [5.0, np.nan]}, index=[1, 2]), Range(1, 3), 0.0)
+    assert tbl.get_df()["B"].tolist()[1:3] == [5.0, 0.0]
+
+    tbl.data.set_column_values_for_range(pd.DataFrame({"A": [10.0, 20.0, 30.0, 40.0]}), Range(0, 4), None)
+    assert tbl.get_df()["A"].tolist() == [10.0, 20.0, 30.0, 40.0]
+
+    # Values for some rows of the range (other rows get default value)
+    tbl.data.set_column_values_for_range(pd.DataFrame({"A": [7.0]}, index=[2]), Range(1, 3), -1.0)
+    assert tbl.get_df()["A"].tolist() == [10.0, -1.0, 7.0, 40.0]
+
+def create_workflow(storage):
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "M"], storage=storage,
+    )
+    g_tbl = sch.create_table(
+        table_name="Groups", attributes=["A"], keys=["A"], storage=storage,
+    )
+
+    sch.calculate(
+        name="M2", table=f_tbl.id,
+        func="lambda x: x * 2.0", columns=["M"], model=None
+    )
+    sch.roll(
+        name="Roll", table=f_tbl.id,
+        window="2", link=None,
+        func="sum", columns=["M"], model=None
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["A"]
+    )
+    sch.aggregate(
+        name="Sum", table=g_tbl.id,
+        tables=["Facts"], link="Link",
+        func="sum", columns=["M2"], model=None
+    )
+
+    return sch
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_save_load(storage, tmp_path):
+    sch = create_workflow(storage)
+
+    sch.get_table("Groups").data.add(pd.DataFrame({"A": ["a", "b"]}))
+    sch.get_table("Facts").data.add(pd.DataFrame({"A": ["a", "b", "a"], "M": [1.0, 2.0, 3.0]}))
+    sch.run()
+
+    # Added but not yet evaluated rows are also saved
+    sch.get_table("Facts").data.add({"A": "b", "M": 4.0})
+
+    sch.save(tmp_path)
+
+    sch2 = create_workflow(storage)
+    sch2.load(tmp_path)
+
+    f_data = sch2.get_table("Facts").data
+    assert f_data.added_range == Range(3, 4)
+    assert f_data.get_df()["M2"].tolist()[:3] == [2.0, 4.0, 6.0]
+
+    sch2.get_table("Facts").data.add({"A": "a", "M": 5.0})
+    sch2.run()
+
+    f_df = sch2.get_table("Facts").get_df()
+    assert f_df["M2"].tolist() == [2.0, 4.0, 6.0, 8.0, 10.0]
+    assert f_df["Roll"].tolist()[1:] == [3.0, 5.0, 7.0, 9.0]
+    assert f_df["Link"].tolist() == [0, 1, 0, 1, 0]
+
+    g_df = sch2.get_table("Groups").get_df()
+    assert g_df["Sum"].tolist() == [18.0, 12.0]
+
+@pytest.mark.parametrize("storage", ["dataframe", "columnar"])
+def test_save_load_state(storage, tmp_path, monkeypatch):
+    def create_state_workflow():
+        sch = create_workflow(storage)
+        sch.roll(
+            name="Group roll", table="Facts",
+            window="2", link="Link",
+            func="sum", columns=["M"], model={}
+        )
+        return sch
+
+    sch = create_state_workflow()
+    sch.get_table("Groups").data.add(pd.DataFrame({"A": ["a", "b"]}))
+    sch.get_table("Facts").data.add(pd.DataFrame({"A": ["a", "b", "a"], "M": [1.0, 2.0, 3.0]}))
+    sch.run()
+    sch.save(tmp_path)
+
+    sch2 = create_state_workflow()
+    sch2.load(tmp_path)
+
+    # Key index of the groups is loaded rather than rebuilt
+    g_data = sch2.get_table("Groups").data
+    index, end, removed_end = g_data.key_indexes[("A",)]
+    assert index == {("a",): 0, ("b",): 1} and end == 2
+
+    # Old rows of the link column are not read because the state of aggregation and rolling is loaded
+    f_data = sch2.get_table("Facts").data
+    slices = []
+    get_slice = type(f_data).get_slice
+    monkeypatch.setattr(type(f_data), "get_slice", lambda self, start, end, columns: slices.append((self, start, columns)) or get_slice(self, start, end, columns))
+    monkeypatch.setattr(type(g_data), "_get_range_values", lambda self, start, end, columns: pytest.fail("Key index is rebuilt"))
+
+    f_data.add(pd.DataFrame({"A": ["b", "a"], "M": [4.0, 5.0]}))
+    sch2.run()
+
+    assert all(start >= 3 for data, start, columns in slices if data is f_data and "Link" in columns)
+    metrics = [x for x in sch2.metrics if x["outputs"] == ["Sum"]][0]
+    assert metrics["rows_read"] == 2
+
+    f_df = sch2.get_table("Facts").get_df()
+    assert f_df["Link"].tolist() == [0, 1, 0, 1, 0]
+    assert f_df["Group roll"].tolist()[2:] == [4.0, 6.0, 8.0]
+    assert sch2.get_table("Groups").get_df()["Sum"].tolist() == [18.0, 12.0]
+
+def create_mmap_workflow(path):
+    sch = Prosto("My Prosto")
+    sch.incremental = True
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A", "B"], storage="mmap", path=path,
+    )
+
+    sch.calculate(
+        name="M2", table=tbl.id,
+        func="lambda x: x * 2.0", columns=["A"], model=None
+    )
+    sch.calculate(
+        name="M3", table=tbl.id,
+        func="lambda x: x * 3.0", columns=["A"], model=None
+    )
+
+    return sch
+
+def test_mmap(tmp_path):
+    sch = create_mmap_workflow(tmp_path)
+
+    tbl = sch.get_table("My table")
+    assert isinstance(tbl.data, MappedData)
+
+    # Add more rows than the initial capacity so that the files grow
+    for i in range(20):
+        tbl.data.add({"A": float(i), "B": "x" + str(i)})
+    sch.run(executor="process", max_workers=2)
+
+    # Numeric columns are mapped to files and object columns are stored in memory
+    assert isinstance(tbl.data.columns["A"], np.memmap)
+    assert isinstance(tbl.data.columns["M2"], np.memmap)
+    assert not isinstance(tbl.data.columns["B"], np.memmap)
+    assert len([x for x in os.listdir(tmp_path) if x.endswith(".npy")]) == 4
+
+    tbl.data.add({"A": 20.0, "B": "x20"})
+    tbl.data.flush()
+
+    # Data and change status are restored from the same directory
+    sch2 = create_mmap_workflow(tmp_path)
+    tbl2 = sch2.get_table("My table")
+    assert tbl2.data.added_range == Range(20, 21)
+    assert tbl2.data.get_df()["B"].tolist()[-1] == "x20"
+
+    sch2.run()
+
+    df = tbl2.get_df()
+    assert df["M2"].tolist() == [2.0 * i for i in range(21)]
+    assert df["M3"].tolist()[-1] == 60.0
+
+def test_mmap_flush(tmp_path, monkeypatch):
+    sch = create_mmap_workflow(tmp_path)
+    tbl = sch.get_table("My table")
+
+    tbl.data.add(pd.DataFrame({"A": [1.0, 2.0], "B": ["x", "y"]}))
+    sch.run()
+    files = dict(tbl.data.files)
+
+    # Object columns which have not been changed are not written again
+    saved = []
+    save = np.save
+    monkeypatch.setattr(np, "save", lambda file, arr, *args, **kwargs: saved.append(file) or save(file, arr, *args, **kwargs))
+
+    sch.incremental = False  # Only the calculated (mapped) columns are written
+    sch.run()
+    assert not saved
+    assert tbl.data.files == files
+
+    tbl.data.add({"A": 3.0, "B": "z"})
+    sch.run()
+    assert len(saved) == 1
+    assert tbl.data.files["B"] != files["B"]
+    assert not os.path.exists(os.path.join(tmp_path, files["B"]))
+
+    sch2 = create_mmap_workflow(tmp_path)
+    assert sch2.get_table("My table").get_df()["B"].tolist() == ["x", "y", "z"]
+
+def test_mmap_path():
+    sch = Prosto("My Prosto")
+
+    with pytest.raises(ValueError):
+        sch.create_table(
+            table_name="My table", attributes=["A"], storage="mmap",
+        )
+
+def test_columnar_no_frame(monkeypatch):
+    sch = Prosto("My Prosto")
+
+    tbl = sch.create_table(
+        table_name="My table", attributes=["A"], storage="columnar",
+    )
+    for i in range(5):
+        sch.calculate(
+            name="C" + str(i), table=tbl.id,
+            func="lambda x: x + {}.0".format(i), columns=["A"], model=None
+        )
+    tbl.data.add(pd.DataFrame({"A": np.arange(10.0)}))
+
+    # Operations read slices of arrays and never build the frame of the whole table
+    calls = []
+    get_df = ColumnarData.get_df
+    monkeypatch.setattr(ColumnarData, "get_df", lambda self: calls.append(1) or get_df(self))
+    sch.run()
+    assert not calls
+
+    monkeypatch.undo()
+    assert tbl.get_df()["C4"].tolist() == [x + 4.0 for x in range(10)]
@@ -110,3 +110,32 @@ def test_two_keys():
     g_tbl_data = g_tbl.get_df()
     assert len(g_tbl_data) == 3
     assert len(g_tbl_data.columns) == 2
+
+def test_key_index(monkeypatch):
+    """Projection uses the key index of the source table and reads only its first rows with each key."""
+    sch = Prosto("My Prosto")
+
+    f_tbl = sch.create_table(
+        table_name="Facts", attributes=["A", "M"], keys=["A"], storage="columnar",
+    )
+    g_tbl = sch.project(
+        table_name="Groups", attributes=["X"],
+        link="Link", tables=["Facts"]
+    )
+    sch.link(
+        name="Link", table=f_tbl.id, type=g_tbl.id,
+        columns=["A"], linked_columns=["X"]
+    )
+
+    calls = []
+    get_df = ColumnarData.get_df
+    monkeypatch.setattr(ColumnarData, "get_df", lambda self: calls.append(self.table.id) or get_df(self))
+
+    f_tbl.data.add(pd.DataFrame({"A": ["a", "b", "a", "c"], "M": [1.0, 2.0, 3.0, 4.0]}))
+    sch.run()
+
+    monkeypatch.undo()
+
+    assert "Facts" not in calls
+    assert g_tbl.get_df()["X"].tolist() == ["a", "b", "c"]
+    assert f_tbl.get_df()["Link"].tolist() == [0, 1, 0, 2]